@@ -6,20 +6,44 @@ from datetime import timedelta
 from typing import TYPE_CHECKING
 
 from homeassistant.const import Platform
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers import config_validation as cv
 from homeassistant.loader import async_get_loaded_integration
 
-from .api import THIMensaApiClient
-from .const import CONF_LOCATION, CONF_PRICE_GROUP, DOMAIN, LOGGER
+from .const import (
+    CONF_DAYS_AHEAD,
+    CONF_EXCLUDE_ALLERGENS,
+    CONF_LOCATION,
+    CONF_PRICE_GROUP,
+    CONF_REQUIRED_FLAGS,
+    CONF_SLOT_RETENTION_DAYS,
+    CONF_STALENESS_BUDGET_HOURS,
+    DEFAULT_DAYS_AHEAD,
+    DEFAULT_SLOT_RETENTION_DAYS,
+    DEFAULT_STALENESS_BUDGET_HOURS,
+    DOMAIN,
+    LOGGER,
+)
 from .coordinator import THIMensaDataUpdateCoordinator
 from .data import THIMensaData
+from .hub import async_get_hub
+from .models import ALLERGENS, FLAGS
+from .services import async_setup_services
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.typing import ConfigType
 
     from .data import THIMensaConfigEntry
 
-PLATFORMS: list[Platform] = [Platform.SENSOR]
+PLATFORMS: list[Platform] = [Platform.CALENDAR, Platform.SENSOR]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the services of the integration."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(
@@ -27,24 +51,54 @@ async def async_setup_entry(
     entry: THIMensaConfigEntry,
 ) -> bool:
     """Set up the Ingolstadt Mensa integration."""
+    hub = async_get_hub(hass)
+    # The hub polls on behalf of all entries, so this coordinator has no
+    # interval of its own and only receives its slice of the batched result.
     coordinator = THIMensaDataUpdateCoordinator(
         hass=hass,
         logger=LOGGER,
         name=DOMAIN,
-        update_interval=timedelta(hours=2),
     )
 
     entry.runtime_data = THIMensaData(
-        client=THIMensaApiClient(
-            session=async_get_clientsession(hass),
-        ),
+        client=hub.client,
         integration=async_get_loaded_integration(hass, entry.domain),
         coordinator=coordinator,
+        hub=hub,
         location=entry.options.get(CONF_LOCATION, entry.data[CONF_LOCATION]),
         price_group=entry.options.get(CONF_PRICE_GROUP, entry.data[CONF_PRICE_GROUP]),
+        days_ahead=int(entry.options.get(CONF_DAYS_AHEAD, DEFAULT_DAYS_AHEAD)),
+        slot_retention=timedelta(
+            days=entry.options.get(
+                CONF_SLOT_RETENTION_DAYS, DEFAULT_SLOT_RETENTION_DAYS
+            )
+        ),
+        staleness_budget=timedelta(
+            hours=entry.options.get(
+                CONF_STALENESS_BUDGET_HOURS, DEFAULT_STALENESS_BUDGET_HOURS
+            )
+        ),
+        excluded_allergens=ALLERGENS.encode(
+            entry.options.get(CONF_EXCLUDE_ALLERGENS, [])
+        ),
+        required_flags=FLAGS.encode(entry.options.get(CONF_REQUIRED_FLAGS, [])),
     )
 
-    await coordinator.async_config_entry_first_refresh()
+    entry.async_on_unload(hub.async_add_location(entry.runtime_data.location))
+    if await coordinator.async_load_cached_data():
+        # Start from the persisted menu and revalidate it without blocking
+        # startup on the API.
+        entry.async_create_background_task(
+            hass,
+            coordinator.async_refresh(),
+            f"{DOMAIN} refresh {entry.runtime_data.location}",
+        )
+    else:
+        await coordinator.async_config_entry_first_refresh()
+    entry.async_on_unload(hub.async_add_listener(coordinator.async_handle_hub_update))
+    entry.async_on_unload(coordinator.async_track_midnight())
+    entry.async_on_unload(coordinator.async_track_language())
+    entry.async_on_unload(coordinator.async_cancel_revalidation)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
@@ -60,6 +114,14 @@ async def async_unload_entry(
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
 
+async def async_remove_entry(
+    hass: HomeAssistant,
+    entry: THIMensaConfigEntry,
+) -> None:
+    """Forget the persisted meal slots of a removed entry."""
+    await async_get_hub(hass).async_remove_entry(entry.entry_id)
+
+
 async def async_reload_entry(
     hass: HomeAssistant,
     entry: THIMensaConfigEntry,
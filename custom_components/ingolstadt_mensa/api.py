@@ -2,13 +2,29 @@
 
 from __future__ import annotations
 
+import asyncio
+import random
 import socket
+import time
+from dataclasses import dataclass
+from enum import StrEnum
+from functools import lru_cache
 from typing import Any
 
 import aiohttp
 import async_timeout
 
-from .const import API_URL
+from .const import (
+    API_BREAKER_FAILURE_THRESHOLD,
+    API_BREAKER_RESET_TIMEOUT,
+    API_RETRY_ATTEMPTS,
+    API_RETRY_BASE_DELAY,
+    API_RETRY_MAX_DELAY,
+    API_TIMEOUT,
+    API_URL,
+    LOGGER,
+)
+from .tracing import RequestTracer
 
 
 class THIMensaApiError(Exception):
@@ -19,33 +35,46 @@ class THIMensaApiCommunicationError(THIMensaApiError):
     """Raised when the API cannot be reached."""
 
 
+class THIMensaApiCircuitOpenError(THIMensaApiCommunicationError):
+    """Raised when requests are short-circuited after repeated failures."""
+
+
 class THIMensaApiResponseError(THIMensaApiError):
     """Raised when the API returns an error payload."""
 
 
-class THIMensaApiClient:
-    """Handle requests to the Neuland GraphQL API."""
+def _is_transient(exception: THIMensaApiError) -> bool:
+    """Return whether a failed request is worth retrying."""
+    if not isinstance(exception, THIMensaApiCommunicationError):
+        return False
+    cause = exception.__cause__
+    if isinstance(cause, aiohttp.ClientResponseError):
+        # Client errors will fail the same way again, except rate limiting
+        return cause.status >= 500 or cause.status == 429
+    return True
 
-    def __init__(self, session: aiohttp.ClientSession) -> None:
-        """Initialize client."""
-        self._session = session
 
-    async def async_fetch_meals(self, locations: list[str]) -> dict[str, Any]:
-        """Fetch meals for the given locations."""
-        query = """
-        query Meals($locations: [LocationInput!]!) {
-          food(locations: $locations) {
-            foodData {
-              timestamp
-              meals {
-                id
-                mealId
-                category
-                restaurant
-                name { de en }
-                prices { student employee guest }
-                allergens
-                flags
+class QueryFeature(StrEnum):
+    """Optional parts of a meal that can be requested from the API."""
+
+    NAME_DE = "name_de"
+    NAME_EN = "name_en"
+    ALLERGENS = "allergens"
+    FLAGS = "flags"
+    VARIANTS = "variants"
+
+
+# Everything the sensors read, i.e. all features except the variants subtree
+DEFAULT_QUERY_FEATURES = frozenset(
+    {
+        QueryFeature.NAME_DE,
+        QueryFeature.NAME_EN,
+        QueryFeature.ALLERGENS,
+        QueryFeature.FLAGS,
+    }
+)
+
+_VARIANTS_SELECTION = """
                 variants {
                   id
                   mealId
@@ -62,21 +91,298 @@ class THIMensaApiClient:
                     category
                     name { de en }
                   }
-                }
-                originalLanguage
-                static
-              }
+                }"""
+
+
+@lru_cache(maxsize=16)
+def build_meals_query(features: frozenset[QueryFeature]) -> str:
+    """
+    Build the GraphQL query selecting only the fields of the given features.
+
+    The result is cached per feature set, so the string is built once.
+    """
+    names = " ".join(
+        language
+        for language, feature in (
+            ("de", QueryFeature.NAME_DE),
+            ("en", QueryFeature.NAME_EN),
+        )
+        if feature in features
+    )
+    fields = ["id", "mealId", "category", "restaurant"]
+    if names:
+        fields.append(f"name {{ {names} }}")
+    fields.append("prices { student employee guest }")
+    if QueryFeature.ALLERGENS in features:
+        fields.append("allergens")
+    if QueryFeature.FLAGS in features:
+        fields.append("flags")
+    meal_selection = "".join(f"\n                {field}" for field in fields)
+    if QueryFeature.VARIANTS in features:
+        meal_selection += _VARIANTS_SELECTION
+
+    return f"""
+        query Meals($locations: [LocationInput!]!) {{
+          food(locations: $locations) {{
+            foodData {{
+              timestamp
+              meals {{{meal_selection}
+              }}
+            }}
+            errors {{ location message }}
+          }}
+        }}
+        """
+
+
+def _restrict_to_locations(
+    food: dict[str, Any], locations: tuple[str, ...]
+) -> dict[str, Any]:
+    """Narrow a response for more locations down to the requested ones."""
+    return {
+        "foodData": [
+            {
+                **entry,
+                "meals": [
+                    meal
+                    for meal in entry.get("meals") or []
+                    if meal.get("restaurant") in locations
+                ],
             }
-            errors { location message }
-          }
-        }
+            for entry in food.get("foodData") or []
+        ],
+        "errors": [
+            error
+            for error in food.get("errors") or []
+            if error.get("location") in (None, *locations)
+        ],
+    }
+
+
+type _RequestKey = tuple[frozenset[QueryFeature], tuple[str, ...]]
+
+
+@dataclass
+class THIMensaApiStats:
+    """Request counters of the API client."""
+
+    requests_issued: int = 0
+    requests_coalesced: int = 0
+    retries: int = 0
+    requests_rejected: int = 0
+    breaker_opened: int = 0
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Bounded retries with jittered exponential backoff."""
+
+    attempts: int = API_RETRY_ATTEMPTS
+    base_delay: float = API_RETRY_BASE_DELAY
+    max_delay: float = API_RETRY_MAX_DELAY
+
+    def delay(self, retry: int) -> float:
+        """Return the delay before the given retry, counted from 0."""
+        # Full jitter spreads the retries of many instances over the window
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**retry))  # noqa: S311
+
+
+class CircuitBreaker:
+    """
+    Stop calling an endpoint that keeps failing.
+
+    After a number of consecutive failures the breaker opens and rejects
+    requests. Once the reset timeout has passed, a single half-open probe is
+    let through: its success closes the breaker, its failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = API_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = API_BREAKER_RESET_TIMEOUT,
+    ) -> None:
+        """Initialize a closed breaker."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """Return the current state of the breaker."""
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._probing or time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        """Return whether a request may be sent, claiming the probe if due."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """Give up a claimed probe without a result, so another can be sent."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful request."""
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> bool:
+        """Count a failed request and return whether the breaker opened."""
+        self.failures += 1
+        if self._probing or (
+            self._opened_at is None and self.failures >= self.failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+            self._probing = False
+            return True
+        return False
+
+
+class THIMensaApiClient:
+    """Handle requests to the Neuland GraphQL API."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        session: aiohttp.ClientSession,
+        *,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        tracer: RequestTracer | None = None,
+        url: str = API_URL,
+        timeout: float = API_TIMEOUT,
+    ) -> None:
+        """
+        Initialize client.
+
+        Pass the tracer whose trace_config the session was created with to
+        also record DNS, connect and time-to-first-byte durations.
+        """
+        self._session = session
+        self._url = url
+        self._timeout = timeout
+        self._in_flight: dict[_RequestKey, asyncio.Task[dict[str, Any]]] = {}
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.tracer = tracer or RequestTracer()
+        self.stats = THIMensaApiStats()
+
+    async def async_fetch_meals(
+        self,
+        locations: list[str],
+        features: frozenset[QueryFeature] = DEFAULT_QUERY_FEATURES,
+    ) -> dict[str, Any]:
         """
-        payload = {"query": query, "variables": {"locations": locations}}
+        Fetch meals for the given locations.
+
+        Only the fields of the given features are requested. Concurrent calls
+        for the same set of locations share a single request.
+        """
+        key = (frozenset(features), tuple(sorted(set(locations))))
+        shared_key = self._find_in_flight(key)
+        if shared_key is None:
+            self.stats.requests_issued += 1
+            task = asyncio.get_running_loop().create_task(
+                self._async_request_with_retry(*key)
+            )
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+            shared_key = key
+        else:
+            self.stats.requests_coalesced += 1
+            task = self._in_flight[shared_key]
+
+        # Shield the shared request so one cancelled caller does not cancel
+        # it for everyone else waiting on it.
+        result = await asyncio.shield(task)
+        if shared_key[1] == key[1]:
+            return result
+        return _restrict_to_locations(result, key[1])
+
+    def _find_in_flight(self, key: _RequestKey) -> _RequestKey | None:
+        """Return the key of an in-flight request covering the given request."""
+        if key in self._in_flight:
+            return key
+        features, locations = key
+        requested = set(locations)
+        for in_flight_key in self._in_flight:
+            in_flight_features, in_flight_locations = in_flight_key
+            # Extra fields in the shared response are harmless
+            if features <= in_flight_features and requested.issubset(
+                in_flight_locations
+            ):
+                return in_flight_key
+        return None
+
+    async def _async_request_with_retry(
+        self, features: frozenset[QueryFeature], locations: tuple[str, ...]
+    ) -> dict[str, Any]:
+        """Send the request, retrying transient failures with backoff."""
+        retry = 0
+        while True:
+            if not self.circuit_breaker.allow_request():
+                self.stats.requests_rejected += 1
+                msg = "Neuland API is failing, requests are paused"
+                raise THIMensaApiCircuitOpenError(msg)
+            try:
+                result = await self._async_request(features, locations)
+            except asyncio.CancelledError:
+                self.circuit_breaker.release_probe()
+                raise
+            except THIMensaApiError as exception:
+                if not _is_transient(exception):
+                    # The endpoint answered, so it is not the one failing
+                    self.circuit_breaker.record_success()
+                    raise
+                if self.circuit_breaker.record_failure():
+                    self.stats.breaker_opened += 1
+                    LOGGER.warning(
+                        "Pausing requests to the Neuland API after %s failures",
+                        self.circuit_breaker.failures,
+                    )
+                    raise
+                if retry + 1 >= self.retry_policy.attempts:
+                    raise
+                delay = self.retry_policy.delay(retry)
+                LOGGER.debug("Retrying Neuland API in %.1fs: %s", delay, exception)
+                retry += 1
+                self.stats.retries += 1
+                await asyncio.sleep(delay)
+            else:
+                self.circuit_breaker.record_success()
+                return result
+
+    async def _async_request(
+        self, features: frozenset[QueryFeature], locations: tuple[str, ...]
+    ) -> dict[str, Any]:
+        """Send the GraphQL request for the given features and locations."""
+        query = build_meals_query(features)
+        payload = {"query": query, "variables": {"locations": list(locations)}}
+        decoder = self.tracer.json_decoder()
         try:
-            async with async_timeout.timeout(15):
-                response = await self._session.post(API_URL, json=payload)
+            async with async_timeout.timeout(self._timeout):
+                started = time.perf_counter()
+                response = await self._session.post(self._url, json=payload)
                 response.raise_for_status()
-                data = await response.json()
+                body_started = time.perf_counter()
+                # The body is kept by the response, so decoding reuses it
+                size = len(await response.read())
+                data = await response.json(loads=decoder)
+                self.tracer.record_response(started, body_started, size, decoder)
         except TimeoutError as exception:
             msg = f"Timeout while calling Neuland API: {exception}"
             raise THIMensaApiCommunicationError(msg) from exception
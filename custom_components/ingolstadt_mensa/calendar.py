@@ -0,0 +1,148 @@
+"""Calendar platform for Ingolstadt Mensa meals."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from typing import TYPE_CHECKING
+
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_LOCATION,
+    DOMAIN,
+    format_location_name,
+    slugify_location_name,
+)
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+    from .coordinator import THIMensaDataUpdateCoordinator
+    from .data import THIMensaConfigEntry
+    from .models import DayMenu, MensaMenu
+
+# Exclusive upper bound for range queries without an end
+_END_OF_TIME = date.max.toordinal() + 1
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: THIMensaConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the menu calendar of an entry."""
+    async_add_entities([MensaCalendar(entry.runtime_data.coordinator, entry)])
+
+
+def _start_ordinal(start: datetime) -> int:
+    """Return the first day whose all-day events end after the given time."""
+    return dt_util.as_local(start).date().toordinal()
+
+
+def _end_ordinal(end: datetime) -> int:
+    """Return the first day whose all-day events start at or after the given time."""
+    local = dt_util.as_local(end)
+    ordinal = local.date().toordinal()
+    return ordinal if local.time() == time.min else ordinal + 1
+
+
+class MensaCalendar(CoordinatorEntity, CalendarEntity):
+    """
+    Show the retained menu as all-day events, one per meal.
+
+    Range queries bisect the sorted date index of the coordinator data, and
+    the events of a day are built once per menu on first use.
+    """
+
+    _attr_has_entity_name = False
+
+    def __init__(
+        self,
+        coordinator: THIMensaDataUpdateCoordinator,
+        entry: THIMensaConfigEntry,
+    ) -> None:
+        """Initialize the calendar of a location."""
+        super().__init__(coordinator)
+        self._config_entry = entry
+        location = entry.options.get(
+            CONF_LOCATION, entry.data.get(CONF_LOCATION, "IngolstadtMensa")
+        )
+        self._location_name = format_location_name(location)
+        self.entity_id = f"calendar.{slugify_location_name(location)}_menu"
+        self._attr_name = f"{self._location_name} Menu"
+        self._attr_unique_id = f"{entry.entry_id}-calendar"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, location)},
+            name=self._location_name,
+            entry_type=DeviceEntryType.SERVICE,
+        )
+        self._events_menu: MensaMenu | None = None
+        self._events: dict[int, list[CalendarEvent]] = {}
+
+    def _day_events(
+        self, menu: MensaMenu, ordinal: int, day_menu: DayMenu
+    ) -> list[CalendarEvent]:
+        """Return the events of a day, building them once per menu."""
+        if menu is not self._events_menu:
+            self._events_menu = menu
+            self._events = {}
+        if (events := self._events.get(ordinal)) is not None:
+            return events
+
+        start = date.fromordinal(ordinal)
+        end = start + timedelta(days=1)
+        price_group = self._config_entry.runtime_data.price_group
+        events = []
+        for index, meal in enumerate(day_menu.meals):
+            details = []
+            if (price := meal.prices.get(price_group)) is not None:
+                details.append(f"{price:.2f} EUR")
+            if meal.flags:
+                details.append(f"Flags: {', '.join(meal.flags)}")
+            if meal.allergens:
+                details.append(f"Allergens: {', '.join(meal.allergens)}")
+            events.append(
+                CalendarEvent(
+                    start=start,
+                    end=end,
+                    summary=meal.name.resolve(menu.language) or f"Meal {index + 1}",
+                    description="\n".join(details) or None,
+                    location=self._location_name,
+                    uid=f"{self._config_entry.entry_id}-{start}-{meal.id or index}",
+                )
+            )
+        self._events[ordinal] = events
+        return events
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """Return the first meal of today or of the next day with a menu."""
+        menu = self.coordinator.data
+        if not menu:
+            return None
+        for ordinal, day_menu in menu.days_between(menu.today, _END_OF_TIME):
+            if events := self._day_events(menu, ordinal, day_menu):
+                return events[0]
+        return None
+
+    async def async_get_events(
+        self,
+        hass: HomeAssistant,  # noqa: ARG002
+        start_date: datetime,
+        end_date: datetime,
+    ) -> list[CalendarEvent]:
+        """Return the meals served between the given times."""
+        menu = self.coordinator.data
+        if not menu:
+            return []
+        return [
+            event
+            for ordinal, day_menu in menu.days_between(
+                _start_ordinal(start_date), _end_ordinal(end_date)
+            )
+            for event in self._day_events(menu, ordinal, day_menu)
+        ]
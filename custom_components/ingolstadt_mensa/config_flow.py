@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import voluptuous as vol
 from homeassistant import config_entries
@@ -16,15 +16,69 @@ from .api import (
     THIMensaApiResponseError,
 )
 from .const import (
+    CONF_DAYS_AHEAD,
+    CONF_EXCLUDE_ALLERGENS,
     CONF_LOCATION,
     CONF_PRICE_GROUP,
+    CONF_REQUIRED_FLAGS,
+    CONF_SLOT_RETENTION_DAYS,
+    CONF_STALENESS_BUDGET_HOURS,
+    DEFAULT_DAYS_AHEAD,
     DEFAULT_LOCATIONS,
+    DEFAULT_SLOT_RETENTION_DAYS,
+    DEFAULT_STALENESS_BUDGET_HOURS,
     DOMAIN,
     LOGGER,
+    MAX_DAYS_AHEAD,
+    MAX_SLOT_RETENTION_DAYS,
+    MAX_STALENESS_BUDGET_HOURS,
     PRICE_GROUPS,
     format_location_name,
     format_price_group_name,
 )
+from .models import ALLERGENS, FLAGS
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .hub import THIMensaHub
+    from .models import CodeRegistry
+
+
+# Select options with label/value dicts, built once instead of per form render
+LOCATION_OPTIONS = [
+    selector.SelectOptionDict(label=format_location_name(loc), value=loc)
+    for loc in DEFAULT_LOCATIONS
+]
+PRICE_GROUP_OPTIONS = [
+    selector.SelectOptionDict(label=format_price_group_name(pg), value=pg)
+    for pg in PRICE_GROUPS
+]
+
+
+def _get_api_client(hass: HomeAssistant) -> THIMensaApiClient:
+    """
+    Return the hub's client when the integration is loaded.
+
+    Sharing the client lets a validation request coalesce with a concurrent
+    coordinator refresh of the same location.
+    """
+    hub: THIMensaHub | None = hass.data.get(DOMAIN)
+    if hub is not None:
+        return hub.client
+    return THIMensaApiClient(session=async_get_clientsession(hass))
+
+
+def _code_selector(registry: CodeRegistry, selected: list[str]) -> selector.Selector:
+    """Return a multi-select of the codes seen so far that accepts new ones."""
+    return selector.SelectSelector(
+        selector.SelectSelectorConfig(
+            options=sorted({*registry.codes(), *selected}),
+            multiple=True,
+            custom_value=True,
+            mode=selector.SelectSelectorMode.DROPDOWN,
+        ),
+    )
 
 
 class THIMensaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -64,17 +118,6 @@ class THIMensaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 formatted_title = format_location_name(location)
                 return self.async_create_entry(title=formatted_title, data=user_input)
 
-        # Create location options list with label/value dicts
-        location_options = [
-            {"label": format_location_name(loc), "value": loc}
-            for loc in DEFAULT_LOCATIONS
-        ]
-
-        # Create price group options list with label/value dicts
-        price_group_options = [
-            {"label": format_price_group_name(pg), "value": pg} for pg in PRICE_GROUPS
-        ]
-
         return self.async_show_form(
             step_id="user",
             data_schema=vol.Schema(
@@ -86,7 +129,7 @@ class THIMensaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         ),
                     ): selector.SelectSelector(
                         selector.SelectSelectorConfig(
-                            options=location_options,
+                            options=LOCATION_OPTIONS,
                             mode=selector.SelectSelectorMode.DROPDOWN,
                         ),
                     ),
@@ -97,7 +140,7 @@ class THIMensaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         ),
                     ): selector.SelectSelector(
                         selector.SelectSelectorConfig(
-                            options=price_group_options,
+                            options=PRICE_GROUP_OPTIONS,
                             mode=selector.SelectSelectorMode.DROPDOWN,
                         ),
                     ),
@@ -108,8 +151,7 @@ class THIMensaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     async def _validate_location(self, location: str) -> None:
         """Check that the chosen location responds with data."""
-        session = async_get_clientsession(self.hass)
-        client = THIMensaApiClient(session=session)
+        client = _get_api_client(self.hass)
         result = await client.async_fetch_meals([location])
         if result.get("errors"):
             raise THIMensaApiResponseError(str(result["errors"]))
@@ -159,17 +201,6 @@ class THIMensaOptionsFlowHandler(config_entries.OptionsFlow):
             else:
                 return self.async_create_entry(title="", data=user_input)
 
-        # Create location options list with label/value dicts
-        location_options = [
-            {"label": format_location_name(loc), "value": loc}
-            for loc in DEFAULT_LOCATIONS
-        ]
-
-        # Create price group options list with label/value dicts
-        price_group_options = [
-            {"label": format_price_group_name(pg), "value": pg} for pg in PRICE_GROUPS
-        ]
-
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema(
@@ -179,7 +210,7 @@ class THIMensaOptionsFlowHandler(config_entries.OptionsFlow):
                         default=current.get(CONF_LOCATION, DEFAULT_LOCATIONS[0]),
                     ): selector.SelectSelector(
                         selector.SelectSelectorConfig(
-                            options=location_options,
+                            options=LOCATION_OPTIONS,
                             mode=selector.SelectSelectorMode.DROPDOWN,
                         ),
                     ),
@@ -188,18 +219,76 @@ class THIMensaOptionsFlowHandler(config_entries.OptionsFlow):
                         default=current.get(CONF_PRICE_GROUP, PRICE_GROUPS[0]),
                     ): selector.SelectSelector(
                         selector.SelectSelectorConfig(
-                            options=price_group_options,
+                            options=PRICE_GROUP_OPTIONS,
                             mode=selector.SelectSelectorMode.DROPDOWN,
                         ),
                     ),
+                    vol.Required(
+                        CONF_DAYS_AHEAD,
+                        default=current.get(CONF_DAYS_AHEAD, DEFAULT_DAYS_AHEAD),
+                    ): vol.All(
+                        selector.NumberSelector(
+                            selector.NumberSelectorConfig(
+                                min=0,
+                                max=MAX_DAYS_AHEAD,
+                                step=1,
+                                mode=selector.NumberSelectorMode.BOX,
+                            ),
+                        ),
+                        vol.Coerce(int),
+                    ),
+                    vol.Required(
+                        CONF_SLOT_RETENTION_DAYS,
+                        default=current.get(
+                            CONF_SLOT_RETENTION_DAYS, DEFAULT_SLOT_RETENTION_DAYS
+                        ),
+                    ): vol.All(
+                        selector.NumberSelector(
+                            selector.NumberSelectorConfig(
+                                min=0,
+                                max=MAX_SLOT_RETENTION_DAYS,
+                                step=1,
+                                mode=selector.NumberSelectorMode.BOX,
+                                unit_of_measurement="days",
+                            ),
+                        ),
+                        vol.Coerce(int),
+                    ),
+                    vol.Required(
+                        CONF_STALENESS_BUDGET_HOURS,
+                        default=current.get(
+                            CONF_STALENESS_BUDGET_HOURS,
+                            DEFAULT_STALENESS_BUDGET_HOURS,
+                        ),
+                    ): vol.All(
+                        selector.NumberSelector(
+                            selector.NumberSelectorConfig(
+                                min=0,
+                                max=MAX_STALENESS_BUDGET_HOURS,
+                                step=1,
+                                mode=selector.NumberSelectorMode.BOX,
+                                unit_of_measurement="h",
+                            ),
+                        ),
+                        vol.Coerce(int),
+                    ),
+                    vol.Required(
+                        CONF_EXCLUDE_ALLERGENS,
+                        default=current.get(CONF_EXCLUDE_ALLERGENS, []),
+                    ): _code_selector(
+                        ALLERGENS, current.get(CONF_EXCLUDE_ALLERGENS, [])
+                    ),
+                    vol.Required(
+                        CONF_REQUIRED_FLAGS,
+                        default=current.get(CONF_REQUIRED_FLAGS, []),
+                    ): _code_selector(FLAGS, current.get(CONF_REQUIRED_FLAGS, [])),
                 }
             ),
             errors=errors,
         )
 
     async def _validate_location(self, location: str) -> None:
-        session = async_get_clientsession(self.hass)
-        client = THIMensaApiClient(session=session)
+        client = _get_api_client(self.hass)
         result = await client.async_fetch_meals([location])
         if result.get("errors"):
             raise THIMensaApiResponseError(str(result["errors"]))
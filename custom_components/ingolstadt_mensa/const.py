@@ -1,12 +1,20 @@
 """Constants for the Ingolstadt Mensa integration."""
 
 import re
+from datetime import timedelta
+from functools import lru_cache
 from logging import Logger, getLogger
 
 DOMAIN = "ingolstadt_mensa"
 LOGGER: Logger = getLogger(__package__)
 
 API_URL = "https://api.neuland.app/graphql"
+API_TIMEOUT = 15
+API_RETRY_ATTEMPTS = 3
+API_RETRY_BASE_DELAY = 1.0
+API_RETRY_MAX_DELAY = 30.0
+API_BREAKER_FAILURE_THRESHOLD = 5
+API_BREAKER_RESET_TIMEOUT = 300.0
 DEFAULT_LOCATIONS = [
     "IngolstadtMensa",
     "NeuburgMensa",
@@ -14,11 +22,40 @@ DEFAULT_LOCATIONS = [
     "Canisius",
 ]
 PRICE_GROUPS = ["student", "employee", "guest"]
+UPDATE_INTERVAL = timedelta(hours=2)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.menu_cache"
+CACHE_SAVE_DELAY = 10
+STALE_REVALIDATE_INTERVAL = timedelta(minutes=15)
+REFRESH_HISTORY_SIZE = 20
+ENTRY_DATE_CACHE_SIZE = 64
 
 CONF_PRICE_GROUP = "price_group"
 CONF_LOCATION = "location"
+CONF_DAYS_AHEAD = "days_ahead"
+CONF_SLOT_RETENTION_DAYS = "slot_retention_days"
+CONF_STALENESS_BUDGET_HOURS = "staleness_budget_hours"
+CONF_EXCLUDE_ALLERGENS = "exclude_allergens"
+CONF_REQUIRED_FLAGS = "required_flags"
+
+DEFAULT_DAYS_AHEAD = 1
+MAX_DAYS_AHEAD = 6
+DEFAULT_SLOT_RETENTION_DAYS = 7
+MAX_SLOT_RETENTION_DAYS = 30
+DEFAULT_STALENESS_BUDGET_HOURS = 24
+MAX_STALENESS_BUDGET_HOURS = 168
+
+ATTR_FRESHNESS = "freshness"
+FRESHNESS_FRESH = "fresh"
+FRESHNESS_STALE = "stale"
 
+# Upper case letters that start a new word, except at the start or after a space
+_WORD_BOUNDARY = re.compile(r"(?<!^)(?<! )([A-Z])")
+_NAME_CACHE_SIZE = 32
 
+
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
 def format_location_name(location: str) -> str:
     """
     Format location name for display.
@@ -28,10 +65,11 @@ def format_location_name(location: str) -> str:
     if not location:
         return "Ingolstadt Mensa"
 
-    formatted = re.sub(r"(?<!^)(?<! )([A-Z])", r" \1", location)
+    formatted = _WORD_BOUNDARY.sub(r" \1", location)
     return formatted.strip()
 
 
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
 def format_price_group_name(price_group: str) -> str:
     """
     Format price group name for display.
@@ -43,6 +81,7 @@ def format_price_group_name(price_group: str) -> str:
     return price_group.capitalize()
 
 
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
 def slugify_location_name(location: str) -> str:
     """
     Convert location name to a slug for use in entity IDs.
@@ -54,7 +93,46 @@ def slugify_location_name(location: str) -> str:
         return "ingolstadt_mensa"
 
     # Convert camelCase to snake_case
-    slug = re.sub(r"(?<!^)(?<! )([A-Z])", r"_\1", location)
+    slug = _WORD_BOUNDARY.sub(r"_\1", location)
     # Convert to lowercase and replace spaces with underscores
     slug = slug.lower().replace(" ", "_")
     return slug
+
+
+def day_key(offset: int) -> str:
+    """
+    Return the key of a day relative to today.
+
+    Example: 0 -> 'today', 1 -> 'tomorrow', 3 -> 'day_3'
+    """
+    if offset == 0:
+        return "today"
+    if offset == 1:
+        return "tomorrow"
+    return f"day_{offset}"
+
+
+def day_offset(day: str) -> int:
+    """
+    Return the offset from today of a day key.
+
+    Example: 'today' -> 0, 'tomorrow' -> 1, 'day_3' -> 3
+    """
+    if day == "today":
+        return 0
+    if day == "tomorrow":
+        return 1
+    return int(day.removeprefix("day_"))
+
+
+def day_label(offset: int) -> str:
+    """
+    Return a display label for a day relative to today.
+
+    Example: 0 -> 'Today', 1 -> 'Tomorrow', 3 -> 'In 3 days'
+    """
+    if offset == 0:
+        return "Today"
+    if offset == 1:
+        return "Tomorrow"
+    return f"In {offset} days"
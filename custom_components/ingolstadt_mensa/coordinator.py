@@ -2,25 +2,41 @@
 
 from __future__ import annotations
 
-from datetime import date, datetime, timedelta
-from typing import Any
+import hashlib
+import json
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, tzinfo
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 
+from homeassistant.const import EVENT_CORE_CONFIG_UPDATE
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later, async_track_time_change
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
 
-from .api import (
-    THIMensaApiClient,
-    THIMensaApiCommunicationError,
-    THIMensaApiError,
-    THIMensaApiResponseError,
+from .const import (
+    ENTRY_DATE_CACHE_SIZE,
+    FRESHNESS_FRESH,
+    FRESHNESS_STALE,
+    REFRESH_HISTORY_SIZE,
+    STALE_REVALIDATE_INTERVAL,
 )
+from .models import DayMenu, MensaMenu, NameCache
+from .search import MealIndex
 
+if TYPE_CHECKING:
+    from logging import Logger
 
-def _parse_entry_date(entry_timestamp: str | None) -> date | None:
-    """Convert a timestamp from the API into a date object."""
-    if not entry_timestamp:
-        return None
+    from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant
 
+    from .hub import THIMensaHub
+
+
+def _parse_entry_date_generic(entry_timestamp: str) -> date | None:
+    """Convert any timestamp Home Assistant understands into a local date."""
     parsed_datetime = dt_util.parse_datetime(entry_timestamp)
     if parsed_datetime:
         return dt_util.as_local(parsed_datetime).date()
@@ -31,56 +47,375 @@ def _parse_entry_date(entry_timestamp: str | None) -> date | None:
         return None
 
 
-def _filter_meals_by_date(food_data: list[dict[str, Any]]) -> dict[str, Any]:
-    """Return meals for today and tomorrow."""
-    today = dt_util.now().date()
-    tomorrow = today + timedelta(days=1)
+@lru_cache(maxsize=ENTRY_DATE_CACHE_SIZE)
+def _parse_entry_date_cached(entry_timestamp: str, time_zone: tzinfo) -> date | None:
+    """Convert a timestamp into a date in the given time zone."""
+    try:
+        # Covers the formats the API sends: dates, naive, offset and Z suffix
+        parsed = datetime.fromisoformat(entry_timestamp)
+    except ValueError:
+        return _parse_entry_date_generic(entry_timestamp)
+    if parsed.tzinfo is None:
+        # Naive values are local already, like dt_util.as_local treats them
+        return parsed.date()
+    return parsed.astimezone(time_zone).date()
+
+
+_cached_time_zone: tzinfo | None = None
+
+
+def _parse_entry_date(entry_timestamp: str | None) -> date | None:
+    """
+    Convert a timestamp from the API into a date object.
+
+    The API repeats a handful of timestamps, so results are memoized per
+    timestamp and time zone. The memo is dropped when the time zone of Home
+    Assistant changes.
+    """
+    global _cached_time_zone  # noqa: PLW0603
+    if not entry_timestamp:
+        return None
+
+    time_zone = dt_util.get_default_time_zone()
+    if time_zone is not _cached_time_zone:
+        _parse_entry_date_cached.cache_clear()
+        _cached_time_zone = time_zone
+    return _parse_entry_date_cached(entry_timestamp, time_zone)
+
 
-    today_meals: list[dict[str, Any]] = []
-    tomorrow_meals: list[dict[str, Any]] = []
-    today_timestamp = today.isoformat()
-    tomorrow_timestamp = tomorrow.isoformat()
+def _decode_food_data(
+    food_data: list[dict[str, Any]],
+    excluded_allergens: int = 0,
+    required_flags: int = 0,
+) -> dict[int, DayMenu]:
+    """
+    Decode every dated foodData entry into an index by ordinal date.
 
+    Only meals passing the dietary filter masks are kept. The last entry of
+    a day wins.
+    """
+    days: dict[int, DayMenu] = {}
     for entry in food_data:
         entry_date = _parse_entry_date(entry.get("timestamp"))
         if not entry_date:
             continue
+        days[entry_date.toordinal()] = DayMenu.from_api(
+            entry_date.isoformat(),
+            entry.get("meals", []),
+            excluded_allergens,
+            required_flags,
+        )
+    return days
+
+
+def _get_preferred_language(hass: HomeAssistant) -> str:
+    """Get the user's preferred language (de or en)."""
+    try:
+        language = hass.config.language
+        if language and language.lower().startswith("de"):
+            return "de"
+    except (AttributeError, TypeError):
+        pass
+    return "en"
+
+
+def _serialize_food_data(food_data: list[dict[str, Any]]) -> str:
+    """Return the canonical JSON form of a location's foodData."""
+    return json.dumps(food_data, sort_keys=True, separators=(",", ":"))
+
+
+def _menu_digest(payload: str, today: date) -> str:
+    """Return a stable digest of a serialized foodData as seen on a given day."""
+    # The day is part of the digest so that a date change is never mistaken
+    # for an unchanged menu.
+    return hashlib.blake2b(
+        f"{today.isoformat()}|{payload}".encode(), digest_size=16
+    ).hexdigest()
 
-        if entry_date == today:
-            today_meals = entry.get("meals", [])
-            today_timestamp = entry_date.isoformat()
-        elif entry_date == tomorrow:
-            tomorrow_meals = entry.get("meals", [])
-            tomorrow_timestamp = entry_date.isoformat()
 
-    return {
-        "today": {
-            "timestamp": today_timestamp,
-            "meals": today_meals,
-        },
-        "tomorrow": {
-            "timestamp": tomorrow_timestamp,
-            "meals": tomorrow_meals,
-        },
-    }
+@dataclass(slots=True)
+class RefreshRecord:
+    """Timings and effects of one processed refresh."""
 
+    finished_at: datetime
+    network_ms: float | None
+    parse_ms: float
+    payload_bytes: int
+    changed: bool
+    entity_writes: int = 0
 
-class THIMensaDataUpdateCoordinator(DataUpdateCoordinator):
-    """Manage fetching meals from the API."""
+
+class THIMensaDataUpdateCoordinator(DataUpdateCoordinator[MensaMenu]):
+    """Provide the meals of one location from the shared hub."""
 
     config_entry: Any
 
-    async def _async_update_data(self) -> Any:
-        """Update data via library."""
-        client: THIMensaApiClient = self.config_entry.runtime_data.client
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        logger: Logger,
+        *,
+        name: str,
+        update_interval: timedelta | None = None,
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            logger,
+            name=name,
+            update_interval=update_interval,
+            # Unchanged menus return the previous data object, which keeps
+            # listeners from being notified.
+            always_update=False,
+        )
+        self._digest: str | None = None
+        self._days: dict[int, DayMenu] = {}
+        self._names: NameCache = {}
+        self.index = MealIndex()
+        self._language: str | None = None
+        self.updates_applied = 0
+        self.updates_skipped = 0
+        self.rollovers = 0
+        self.entity_writes = 0
+        self.refresh_history: deque[RefreshRecord] = deque(maxlen=REFRESH_HISTORY_SIZE)
+        self.last_successful_update: datetime | None = None
+        self._stale = False
+        self._unsub_revalidate: CALLBACK_TYPE | None = None
+        # Slots whose render changed since listeners were last notified, or
+        # None when every slot has to be written.
+        self.changed_slots: frozenset[tuple[int, int]] | None = None
+        self._notified_menu: MensaMenu | None = None
+        self._notified_status: tuple[bool, str] | None = None
+
+    @property
+    def freshness(self) -> str:
+        """Return whether the served menu is confirmed by the last refresh."""
+        return FRESHNESS_STALE if self._stale else FRESHNESS_FRESH
+
+    def _mark_successful(self, *, stale: bool = False) -> None:
+        """Record the fetch time of the data that is about to be served."""
+        runtime_data = self.config_entry.runtime_data
+        self.last_successful_update = (
+            runtime_data.hub.fetched_at(runtime_data.location) or dt_util.utcnow()
+        )
+        self._stale = stale
+        if not stale:
+            self.async_cancel_revalidation()
+
+    def _serve_stale(self, error: Exception) -> bool:
+        """
+        Keep serving the last good menu while it is within the staleness budget.
+
+        Returns whether the error was absorbed.
+        """
+        budget = self.config_entry.runtime_data.staleness_budget
+        if (
+            self.data is None
+            or self.last_successful_update is None
+            or dt_util.utcnow() - self.last_successful_update >= budget
+        ):
+            return False
+        if not self._stale:
+            self.logger.warning(
+                "Serving the menu of %s while the update fails: %s",
+                self.last_successful_update.isoformat(),
+                error,
+            )
+        self._stale = True
+        self._async_schedule_revalidation()
+        return True
+
+    @callback
+    def _async_schedule_revalidation(self) -> None:
+        """Retry the shared refresh sooner than the regular interval."""
+        if self._unsub_revalidate is None:
+            self._unsub_revalidate = async_call_later(
+                self.hass, STALE_REVALIDATE_INTERVAL, self._async_revalidate
+            )
+
+    async def _async_revalidate(self, _now: datetime) -> None:
+        """Ask the hub to refresh the stale menu in the background."""
+        self._unsub_revalidate = None
+        hub: THIMensaHub = self.config_entry.runtime_data.hub
+        await hub.async_request_refresh()
+        # Keep trying until a refresh succeeds or the budget runs out
+        if self._stale and self.last_update_success:
+            self._async_schedule_revalidation()
+
+    @callback
+    def async_cancel_revalidation(self) -> None:
+        """Cancel a pending background revalidation."""
+        if self._unsub_revalidate is not None:
+            self._unsub_revalidate()
+            self._unsub_revalidate = None
+
+    def _process_food_data(
+        self, food_data: list[dict[str, Any]], network_ms: float | None = None
+    ) -> tuple[MensaMenu, bool]:
+        """Return the rendered menu and whether it differs from the current one."""
+        started = time.perf_counter()
+        payload = _serialize_food_data(food_data)
+        digest = _menu_digest(payload, dt_util.now().date())
+        changed = digest != self._digest or self.data is None
+        if changed:
+            self._digest = digest
+            self.updates_applied += 1
+            runtime_data = self.config_entry.runtime_data
+            self._days = _decode_food_data(
+                food_data, runtime_data.excluded_allergens, runtime_data.required_flags
+            )
+            self.index.update(self._days)
+            # Names are resolved again for the new data, then reused
+            self._names = {}
+            data = self._build_menu()
+        else:
+            self.updates_skipped += 1
+            data = self.data
+
+        self.refresh_history.append(
+            RefreshRecord(
+                finished_at=dt_util.utcnow(),
+                network_ms=network_ms,
+                parse_ms=(time.perf_counter() - started) * 1000,
+                payload_bytes=len(payload),
+                changed=changed,
+            )
+        )
+        return data, changed
+
+    def _changed_slots(self) -> frozenset[tuple[int, int]] | None:
+        """Return the slots rendered differently than at the last notification."""
+        menu = self.data
+        previous = self._notified_menu
+        if (
+            menu is None
+            or previous is None
+            or (self.last_update_success, self.freshness) != self._notified_status
+        ):
+            # Availability and freshness are part of every slot's state
+            return None
+        if menu is previous:
+            return frozenset()
+        slots, previous_slots = menu.slots, previous.slots
+        return frozenset(
+            key
+            for key in slots.keys() | previous_slots.keys()
+            if slots.get(key) != previous_slots.get(key)
+        )
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all listeners and count the entity writes they caused."""
+        self.changed_slots = self._changed_slots()
+        writes_before = self.entity_writes
+        super().async_update_listeners()
+        self._notified_menu = self.data
+        self._notified_status = (self.last_update_success, self.freshness)
+        if self.refresh_history:
+            self.refresh_history[-1].entity_writes += self.entity_writes - writes_before
+
+    def _build_menu(self) -> MensaMenu:
+        """Render the configured horizon from the retained days."""
+        runtime_data = self.config_entry.runtime_data
+        self._language = _get_preferred_language(self.hass)
+        return MensaMenu.build(
+            self._days,
+            dt_util.now().date().toordinal(),
+            runtime_data.days_ahead,
+            self._language,
+            runtime_data.price_group,
+            self._names,
+        )
+
+    @callback
+    def async_track_language(self) -> CALLBACK_TYPE:
+        """Re-render names when the Home Assistant language changes."""
+        return self.hass.bus.async_listen(
+            EVENT_CORE_CONFIG_UPDATE, self._async_core_config_updated
+        )
+
+    @callback
+    def _async_core_config_updated(self, _event: Event) -> None:
+        """Drop the resolved names if the preferred language changed."""
+        if self.data is None or _get_preferred_language(self.hass) == self._language:
+            return
+        self._names.clear()
+        self.data = self._build_menu()
+        self.async_update_listeners()
+
+    @callback
+    def async_track_midnight(self) -> CALLBACK_TYPE:
+        """Re-slice the retained days at local midnight and return a remover."""
+        return async_track_time_change(
+            self.hass, self._async_midnight_rollover, hour=0, minute=0, second=0
+        )
+
+    @callback
+    def _async_midnight_rollover(self, _now: datetime) -> None:
+        """Shift the days without a network request."""
+        if self.data is None:
+            return
+        self.rollovers += 1
+        # Set the data directly so an ongoing error state is kept.
+        self.data = self._build_menu()
+        self.async_update_listeners()
+
+    async def async_load_cached_data(self) -> bool:
+        """Serve the persisted menu, if one exists, without a network request."""
+        hub: THIMensaHub = self.config_entry.runtime_data.hub
+        location = self.config_entry.runtime_data.location
+        food_data = await hub.async_get_cached_food_data(location)
+        if food_data is None:
+            return False
+        # Persisted data counts as stale until a refresh confirms it
+        self._mark_successful(stale=True)
+        self.async_set_updated_data(self._process_food_data(food_data)[0])
+        return True
+
+    async def _async_update_data(self) -> MensaMenu:
+        """Update data from the hub's batched request."""
+        hub: THIMensaHub = self.config_entry.runtime_data.hub
         location = self.config_entry.runtime_data.location
         try:
-            result = await client.async_fetch_meals([location])
-            if result.get("errors"):
-                error_message = str(result["errors"])
-                raise UpdateFailed(error_message)
-            return _filter_meals_by_date(result.get("foodData", []))
-        except (THIMensaApiResponseError, THIMensaApiCommunicationError) as exception:
-            raise UpdateFailed(exception) from exception
-        except THIMensaApiError as exception:
-            raise UpdateFailed(exception) from exception
+            food_data = await hub.async_get_food_data(location)
+        except UpdateFailed as error:
+            was_stale = self._stale
+            if self._serve_stale(error):
+                if not was_stale:
+                    # The data object is unchanged, so always_update=False
+                    # would not publish the changed freshness attribute.
+                    self.async_update_listeners()
+                return self.data
+            raise
+        self._mark_successful()
+        return self._process_food_data(food_data, hub.last_fetch_ms)[0]
+
+    @callback
+    def async_handle_hub_update(self) -> None:
+        """Fan out the slice of a batched hub refresh that belongs to this entry."""
+        hub: THIMensaHub = self.config_entry.runtime_data.hub
+        location = self.config_entry.runtime_data.location
+
+        error: Exception | None = None
+        if not hub.last_update_success:
+            error = hub.last_exception or UpdateFailed("Hub update failed")
+        elif location in hub.location_errors:
+            error = UpdateFailed(hub.location_errors[location])
+        if error is not None:
+            was_stale = self._stale
+            if not self._serve_stale(error):
+                self.async_set_update_error(error)
+            elif not was_stale:
+                # Publish the changed freshness attribute
+                self.async_update_listeners()
+            return
+        if not hub.data or location not in hub.data:
+            return
+
+        was_stale = self._stale
+        self._mark_successful()
+        data, changed = self._process_food_data(hub.data[location], hub.last_fetch_ms)
+        # A recovering coordinator must notify even for an unchanged menu so
+        # that its entities leave the error or stale state.
+        if changed or was_stale or not self.last_update_success:
+            self.async_set_updated_data(data)
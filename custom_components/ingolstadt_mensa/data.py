@@ -6,11 +6,14 @@ from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from datetime import timedelta
+
     from homeassistant.config_entries import ConfigEntry
     from homeassistant.loader import Integration
 
     from .api import THIMensaApiClient
     from .coordinator import THIMensaDataUpdateCoordinator
+    from .hub import THIMensaHub
 
 
 type THIMensaConfigEntry = ConfigEntry[THIMensaData]
@@ -22,6 +25,13 @@ class THIMensaData:
 
     client: THIMensaApiClient
     coordinator: THIMensaDataUpdateCoordinator
+    hub: THIMensaHub
     integration: Integration
     location: str
     price_group: str
+    days_ahead: int
+    slot_retention: timedelta
+    staleness_budget: timedelta
+    # Dietary filter as allergen and flag masks, 0 when unset
+    excluded_allergens: int
+    required_flags: int
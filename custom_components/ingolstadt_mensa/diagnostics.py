@@ -0,0 +1,116 @@
+"""Diagnostics support for Ingolstadt Mensa."""
+
+from __future__ import annotations
+
+import dataclasses
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.diagnostics import async_redact_data
+
+from .api import build_meals_query
+from .models import ALLERGENS, FLAGS
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .coordinator import THIMensaDataUpdateCoordinator
+    from .data import THIMensaConfigEntry
+
+# Meal texts are not needed to judge the shape of the parsed model
+TO_REDACT = {"de", "en", "display_de", "display_en"}
+
+
+def _ratio(hits: int, misses: int) -> float | None:
+    """Return the share of hits, or None without any lookups."""
+    total = hits + misses
+    return round(hits / total, 3) if total else None
+
+
+def _model_sample(coordinator: THIMensaDataUpdateCoordinator) -> dict[str, Any] | None:
+    """Return the first parsed meal of the served menu."""
+    menu = coordinator.data
+    if not menu:
+        return None
+    for day_menu in menu.days.values():
+        if day_menu.meals:
+            meal = day_menu.meals[0]
+            return {
+                "timestamp": day_menu.timestamp,
+                "meal_count": len(day_menu.meals),
+                "meal": async_redact_data(
+                    {
+                        **dataclasses.asdict(meal),
+                        "allergens": list(meal.allergens),
+                        "flags": list(meal.flags),
+                    },
+                    TO_REDACT,
+                ),
+                "registered_codes": {"allergens": len(ALLERGENS), "flags": len(FLAGS)},
+            }
+    return None
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant,
+    entry: THIMensaConfigEntry,
+) -> dict[str, Any]:
+    """Return a performance snapshot of a config entry."""
+    runtime_data = entry.runtime_data
+    coordinator = runtime_data.coordinator
+    hub = runtime_data.hub
+    client = hub.client
+    breaker = client.circuit_breaker
+    last_update = coordinator.last_successful_update
+
+    return {
+        "entry": {
+            "data": dict(entry.data),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "freshness": coordinator.freshness,
+            "last_successful_update": last_update.isoformat() if last_update else None,
+            "updates_applied": coordinator.updates_applied,
+            "updates_skipped": coordinator.updates_skipped,
+            "unchanged_ratio": _ratio(
+                coordinator.updates_skipped, coordinator.updates_applied
+            ),
+            "rollovers": coordinator.rollovers,
+            "entity_writes": coordinator.entity_writes,
+            "refreshes": [
+                {
+                    **dataclasses.asdict(record),
+                    "finished_at": record.finished_at.isoformat(),
+                }
+                for record in coordinator.refresh_history
+            ],
+        },
+        "hub": {
+            "locations": hub.locations,
+            "last_update_success": hub.last_update_success,
+            "last_fetch_ms": hub.last_fetch_ms,
+            "disk_cache": {
+                "locations": hub.cache_size,
+                "hits": hub.cache_hits,
+                "misses": hub.cache_misses,
+                "hit_ratio": _ratio(hub.cache_hits, hub.cache_misses),
+            },
+        },
+        "api": {
+            "stats": dataclasses.asdict(client.stats),
+            "coalesced_ratio": _ratio(
+                client.stats.requests_coalesced, client.stats.requests_issued
+            ),
+            "query_cache": build_meals_query.cache_info()._asdict(),
+            "retry_policy": dataclasses.asdict(client.retry_policy),
+            "circuit_breaker": {
+                "state": breaker.state,
+                "failures": breaker.failures,
+                "failure_threshold": breaker.failure_threshold,
+                "reset_timeout": breaker.reset_timeout,
+            },
+            "latency": client.tracer.snapshot(),
+        },
+        "model_sample": _model_sample(coordinator),
+    }
@@ -0,0 +1,244 @@
+"""Domain-wide hub that batches the menus of all configured locations."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .api import THIMensaApiClient, THIMensaApiError
+from .const import (
+    CACHE_SAVE_DELAY,
+    DOMAIN,
+    LOGGER,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+    UPDATE_INTERVAL,
+)
+from .tracing import RequestTracer
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+
+
+def _partition_food_data(
+    food_data: list[dict[str, Any]], locations: list[str]
+) -> dict[str, list[dict[str, Any]]]:
+    """Split a batched foodData list into one list per location."""
+    partitioned: dict[str, list[dict[str, Any]]] = {loc: [] for loc in locations}
+    single_location = locations[0] if len(locations) == 1 else None
+
+    for entry in food_data:
+        meals_by_location: dict[str, list[dict[str, Any]]] = {
+            loc: [] for loc in locations
+        }
+        for meal in entry.get("meals") or []:
+            # Meals without a restaurant can only be attributed unambiguously
+            # when a single location was requested.
+            restaurant = meal.get("restaurant") or single_location
+            if restaurant in meals_by_location:
+                meals_by_location[restaurant].append(meal)
+
+        for location, meals in meals_by_location.items():
+            partitioned[location].append(
+                {"timestamp": entry.get("timestamp"), "meals": meals}
+            )
+
+    return partitioned
+
+
+def _partition_errors(
+    errors: list[dict[str, Any]] | None, locations: list[str]
+) -> dict[str, str]:
+    """Map the per-location errors of a batched response to their location."""
+    location_errors: dict[str, str] = {}
+    for error in errors or []:
+        message = str(error.get("message") or error)
+        location = error.get("location")
+        # An error without a location applies to every requested location
+        targets = [location] if location in locations else locations
+        for target in targets:
+            location_errors[target] = message
+    return location_errors
+
+
+class THIMensaHub(DataUpdateCoordinator[dict[str, list[dict[str, Any]]]]):
+    """Fetch the menus of all configured locations in one request per cycle."""
+
+    def __init__(self, hass: HomeAssistant, client: THIMensaApiClient) -> None:
+        """Initialize the hub."""
+        super().__init__(
+            hass,
+            LOGGER,
+            # The hub outlives single config entries, so it must not be bound
+            # to the entry that happened to create it.
+            config_entry=None,
+            name=f"{DOMAIN}_hub",
+            update_interval=UPDATE_INTERVAL,
+        )
+        self.client = client
+        self.location_errors: dict[str, str] = {}
+        self._locations: dict[str, int] = {}
+        self._fetch_lock = asyncio.Lock()
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._cache: dict[str, dict[str, Any]] | None = None
+        self._idle_slots: dict[str, dict[str, str]] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.last_fetch_ms: float | None = None
+
+    @property
+    def cache_size(self) -> int:
+        """Return the number of locations in the loaded menu cache."""
+        return len(self._cache or {})
+
+    @property
+    def locations(self) -> list[str]:
+        """Return the sorted list of registered locations."""
+        return sorted(self._locations)
+
+    @callback
+    def async_add_location(self, location: str) -> CALLBACK_TYPE:
+        """Register a location for the batched request and return a remover."""
+        self._locations[location] = self._locations.get(location, 0) + 1
+
+        @callback
+        def _remove_location() -> None:
+            self._locations[location] -= 1
+            if self._locations[location]:
+                return
+            del self._locations[location]
+            self.location_errors.pop(location, None)
+            if self.data:
+                self.data.pop(location, None)
+
+        return _remove_location
+
+    async def _async_load_cache(self) -> dict[str, dict[str, Any]]:
+        """Load the persisted menus once and return them."""
+        if self._cache is None:
+            stored = await self._store.async_load() or {}
+            self._cache = stored.get("locations", {})
+            self._idle_slots = stored.get("idle_slots", {})
+        return self._cache
+
+    async def async_get_cached_food_data(
+        self, location: str
+    ) -> list[dict[str, Any]] | None:
+        """Return the last persisted foodData of a location, if any."""
+        cache = await self._async_load_cache()
+        if (cached := cache.get(location)) is None:
+            self.cache_misses += 1
+            return None
+        self.cache_hits += 1
+        return cached["food_data"]
+
+    @callback
+    def fetched_at(self, location: str) -> datetime | None:
+        """Return when the menu of a location was last fetched successfully."""
+        if self._cache is None or (cached := self._cache.get(location)) is None:
+            return None
+        fetched_at = dt_util.parse_datetime(cached["fetched_at"])
+        return dt_util.as_utc(fetched_at) if fetched_at else None
+
+    @callback
+    def _async_update_cache(self, data: dict[str, list[dict[str, Any]]]) -> None:
+        """Remember successfully fetched menus and persist them lazily."""
+        if self._cache is None:
+            return
+        fetched_at = dt_util.utcnow().isoformat()
+        for location, food_data in data.items():
+            if location not in self.location_errors:
+                self._cache[location] = {
+                    "fetched_at": fetched_at,
+                    "food_data": food_data,
+                }
+        self._store.async_delay_save(self._cache_to_store, CACHE_SAVE_DELAY)
+
+    async def async_get_idle_slots(self, entry_id: str) -> dict[str, str]:
+        """Return the persisted idle-since times of the meal slots of an entry."""
+        await self._async_load_cache()
+        return dict(self._idle_slots.get(entry_id, {}))
+
+    @callback
+    def async_set_idle_slots(self, entry_id: str, idle_slots: dict[str, str]) -> None:
+        """Persist the idle-since times of the meal slots of an entry lazily."""
+        if self._cache is None:
+            return
+        if idle_slots:
+            self._idle_slots[entry_id] = idle_slots
+        elif self._idle_slots.pop(entry_id, None) is None:
+            return
+        self._store.async_delay_save(self._cache_to_store, CACHE_SAVE_DELAY)
+
+    async def async_remove_entry(self, entry_id: str) -> None:
+        """Drop the persisted state of a removed entry."""
+        await self._async_load_cache()
+        self.async_set_idle_slots(entry_id, {})
+
+    @callback
+    def _cache_to_store(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {"locations": self._cache, "idle_slots": self._idle_slots}
+
+    async def async_get_food_data(self, location: str) -> list[dict[str, Any]]:
+        """Return the foodData of a location, fetching all locations if needed."""
+        async with self._fetch_lock:
+            # Entries set up concurrently wait here, so the first one fetches
+            # every registered location and the others reuse its result. After
+            # a failed refresh the retained data is outdated, so fetch again.
+            if (
+                self.data is None
+                or location not in self.data
+                or not self.last_update_success
+            ):
+                await self.async_refresh()
+
+        if not self.last_update_success:
+            raise UpdateFailed(str(self.last_exception or "Hub update failed"))
+        if location in self.location_errors:
+            raise UpdateFailed(self.location_errors[location])
+        if self.data is None or location not in self.data:
+            msg = f"No data available for location {location}"
+            raise UpdateFailed(str(self.last_exception or msg))
+        return self.data[location]
+
+    async def _async_update_data(self) -> dict[str, list[dict[str, Any]]]:
+        """Fetch all registered locations with a single GraphQL request."""
+        locations = self.locations
+        if not locations:
+            return {}
+
+        await self._async_load_cache()
+        started = time.perf_counter()
+        try:
+            result = await self.client.async_fetch_meals(locations)
+        except THIMensaApiError as exception:
+            raise UpdateFailed(exception) from exception
+        self.last_fetch_ms = (time.perf_counter() - started) * 1000
+
+        self.location_errors = _partition_errors(result.get("errors"), locations)
+        data = _partition_food_data(result.get("foodData") or [], locations)
+        self._async_update_cache(data)
+        return data
+
+
+@callback
+def async_get_hub(hass: HomeAssistant) -> THIMensaHub:
+    """Return the shared hub, creating it on first use."""
+    hub: THIMensaHub | None = hass.data.get(DOMAIN)
+    if hub is None:
+        tracer = RequestTracer()
+        # A dedicated session, so the trace hooks only see our own requests
+        session = async_create_clientsession(hass, trace_configs=[tracer.trace_config])
+        hub = THIMensaHub(hass, THIMensaApiClient(session=session, tracer=tracer))
+        hass.data[DOMAIN] = hub
+    return hub
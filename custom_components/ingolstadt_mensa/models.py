@@ -0,0 +1,340 @@
+"""Typed meal model decoded once per refresh from the API payload."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+RESTAURANT_PREFIXES = ("thi mensa", "ingolstadt mensa")
+
+CATEGORY_ICONS = {
+    "main": "mdi:silverware-fork-knife",
+    "salad": "mdi:bowl-mix",
+    "desert": "mdi:cake",
+    "dessert": "mdi:cake",  # Handle correct spelling too
+    "soup": "mdi:bowl",
+}
+DEFAULT_ICON = "mdi:food"
+
+# Display names resolved per (meal id, language)
+type NameCache = dict[tuple[str, str], str | None]
+
+
+def category_icon(category: str | None) -> str:
+    """Return Home Assistant icon based on meal category."""
+    if not category:
+        return DEFAULT_ICON
+    return CATEGORY_ICONS.get(category.lower(), DEFAULT_ICON)
+
+
+def strip_restaurant_prefix(name: str | None) -> str | None:
+    """Remove the leading restaurant label from a meal name."""
+    if not name:
+        return name
+
+    normalized = name.strip()
+    # Try various prefix formats (case-insensitive)
+    normalized_lower = normalized.lower()
+    for prefix in RESTAURANT_PREFIXES:
+        if normalized_lower.startswith(prefix):
+            remaining = normalized[len(prefix) :].lstrip(" :-")
+            if remaining:
+                normalized = remaining
+            break
+
+    return normalized
+
+
+def _round_price(price: Any) -> float | None:
+    """Round a raw price to cents."""
+    if price is None:
+        return None
+    return round(float(price), 2)
+
+
+class CodeRegistry:
+    """
+    Assign every allergen or flag code seen a bit of its own.
+
+    Meals carry their codes as integer masks, so filters are single bitwise
+    operations. Codes are registered for the lifetime of the process, as the
+    API only uses a small, fixed set of them.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._bits: dict[str, int] = {}
+        self._decoded: dict[int, tuple[str, ...]] = {0: ()}
+
+    def __len__(self) -> int:
+        """Return the number of registered codes."""
+        return len(self._bits)
+
+    def encode(self, codes: Iterable[str]) -> int:
+        """Return the mask of the given codes, registering unseen ones."""
+        mask = 0
+        for code in codes:
+            bit = self._bits.get(code)
+            if bit is None:
+                bit = self._bits[code] = 1 << len(self._bits)
+            mask |= bit
+        return mask
+
+    def codes(self) -> list[str]:
+        """Return the registered codes, sorted."""
+        return sorted(self._bits)
+
+    def bit(self, code: str) -> int:
+        """Return the bit of a code, or 0 for a code never seen."""
+        return self._bits.get(code, 0)
+
+    def decode(self, mask: int) -> tuple[str, ...]:
+        """Return the sorted codes of a mask."""
+        codes = self._decoded.get(mask)
+        if codes is None:
+            codes = self._decoded[mask] = tuple(
+                sorted(code for code, bit in self._bits.items() if mask & bit)
+            )
+        return codes
+
+
+ALLERGENS = CodeRegistry()
+FLAGS = CodeRegistry()
+
+
+@dataclass(frozen=True, slots=True)
+class LocalizedName:
+    """Meal name in both API languages."""
+
+    de: str | None
+    en: str | None
+    display_de: str | None
+    display_en: str | None
+
+    @classmethod
+    def from_api(cls, data: dict[str, Any] | None) -> LocalizedName:
+        """Decode the name object of a meal."""
+        data = data or {}
+        de = data.get("de")
+        en = data.get("en")
+        return cls(
+            de=de,
+            en=en,
+            display_de=strip_restaurant_prefix(de) if de else None,
+            display_en=strip_restaurant_prefix(en) if en else None,
+        )
+
+    def resolve(self, language: str) -> str | None:
+        """Return the display name in a language, falling back to the other."""
+        if language == "de":
+            return self.display_de or self.display_en
+        return self.display_en or self.display_de
+
+
+@dataclass(frozen=True, slots=True)
+class Prices:
+    """Meal prices per price group, rounded to cents."""
+
+    student: float | None
+    employee: float | None
+    guest: float | None
+
+    @classmethod
+    def from_api(cls, data: dict[str, Any] | None) -> Prices:
+        """Decode the prices object of a meal."""
+        data = data or {}
+        return cls(
+            student=_round_price(data.get("student")),
+            employee=_round_price(data.get("employee")),
+            guest=_round_price(data.get("guest")),
+        )
+
+    def get(self, price_group: str) -> float | None:
+        """Return the price of a price group."""
+        return getattr(self, price_group, None)
+
+
+@dataclass(frozen=True, slots=True)
+class Meal:
+    """A single meal of a day's menu."""
+
+    id: str | None
+    meal_id: str | None
+    category: str | None
+    restaurant: str | None
+    name: LocalizedName
+    prices: Prices
+    allergen_mask: int
+    flag_mask: int
+    icon: str
+
+    @classmethod
+    def from_api(cls, data: dict[str, Any]) -> Meal:
+        """Decode a meal object."""
+        category = data.get("category")
+        return cls(
+            id=data.get("id"),
+            meal_id=data.get("mealId"),
+            category=category,
+            restaurant=data.get("restaurant"),
+            name=LocalizedName.from_api(data.get("name")),
+            prices=Prices.from_api(data.get("prices")),
+            allergen_mask=ALLERGENS.encode(data.get("allergens") or ()),
+            flag_mask=FLAGS.encode(data.get("flags") or ()),
+            icon=category_icon(category),
+        )
+
+    def is_eligible(self, excluded_allergens: int, required_flags: int) -> bool:
+        """Return whether the meal passes an allergen and flag filter mask."""
+        return (
+            not self.allergen_mask & excluded_allergens
+            and self.flag_mask & required_flags == required_flags
+        )
+
+    @property
+    def allergens(self) -> tuple[str, ...]:
+        """Return the allergen codes of the meal."""
+        return ALLERGENS.decode(self.allergen_mask)
+
+    @property
+    def flags(self) -> tuple[str, ...]:
+        """Return the flag codes of the meal."""
+        return FLAGS.decode(self.flag_mask)
+
+
+@dataclass(frozen=True, slots=True)
+class DayMenu:
+    """All meals served on one day."""
+
+    timestamp: str
+    meals: tuple[Meal, ...]
+
+    @classmethod
+    def from_api(
+        cls,
+        timestamp: str,
+        meals: list[dict[str, Any]],
+        excluded_allergens: int = 0,
+        required_flags: int = 0,
+    ) -> DayMenu:
+        """Decode the meals of a foodData entry that pass the dietary filter."""
+        decoded = (Meal.from_api(meal) for meal in meals)
+        if excluded_allergens or required_flags:
+            decoded = (
+                meal
+                for meal in decoded
+                if meal.is_eligible(excluded_allergens, required_flags)
+            )
+        return cls(timestamp=timestamp, meals=tuple(decoded))
+
+
+@dataclass(frozen=True, slots=True)
+class SlotRender:
+    """Precomputed state of one meal slot, returned by reference to entities."""
+
+    name: str | None
+    icon: str
+    native_value: float | None
+    prices: Prices
+    attributes: Mapping[str, Any]
+
+    @classmethod
+    def from_meal(
+        cls,
+        meal: Meal,
+        timestamp: str,
+        language: str,
+        price_group: str,
+        names: NameCache | None = None,
+    ) -> SlotRender:
+        """
+        Render a meal for the given language and price group.
+
+        Resolved names are looked up in and added to the given name cache.
+        """
+        prices = meal.prices
+        selected_price = prices.get(price_group)
+        if names is None or meal.id is None:
+            name = meal.name.resolve(language)
+        elif (key := (meal.id, language)) in names:
+            name = names[key]
+        else:
+            name = names[key] = meal.name.resolve(language)
+        return cls(
+            name=name,
+            icon=meal.icon,
+            native_value=selected_price,
+            prices=prices,
+            attributes=MappingProxyType(
+                {
+                    "name_de": meal.name.de,
+                    "name_en": meal.name.en,
+                    "category": meal.category,
+                    "restaurant": meal.restaurant,
+                    "allergens": list(meal.allergens),
+                    "flags": list(meal.flags),
+                    "date": timestamp,
+                    "price": selected_price,
+                    "price_student": prices.student,
+                    "price_employee": prices.employee,
+                    "price_guest": prices.guest,
+                }
+            ),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class MensaMenu:
+    """Date-indexed menus of an entry with the render record of each slot."""
+
+    today: int
+    days: dict[int, DayMenu]
+    slots: dict[tuple[int, int], SlotRender]
+    language: str
+    # Ordinal dates of the retained days in ascending order, for range queries
+    dates: tuple[int, ...]
+
+    @classmethod
+    def build(  # noqa: PLR0913
+        cls,
+        days: dict[int, DayMenu],
+        today: int,
+        days_ahead: int,
+        language: str,
+        price_group: str,
+        names: NameCache | None = None,
+    ) -> MensaMenu:
+        """Render every slot from today up to the given number of days ahead."""
+        slots: dict[tuple[int, int], SlotRender] = {}
+        for offset in range(days_ahead + 1):
+            day_menu = days.get(today + offset)
+            if day_menu is None:
+                continue
+            for index, meal in enumerate(day_menu.meals):
+                slots[(offset, index)] = SlotRender.from_meal(
+                    meal, day_menu.timestamp, language, price_group, names
+                )
+        return cls(
+            today=today,
+            days=days,
+            slots=slots,
+            language=language,
+            dates=tuple(sorted(days)),
+        )
+
+    def day(self, offset: int) -> DayMenu | None:
+        """Return the menu of the day at the given offset from today."""
+        return self.days.get(self.today + offset)
+
+    def days_between(self, start: int, end: int) -> list[tuple[int, DayMenu]]:
+        """Return the ordinal dates and menus from start up to excluding end."""
+        dates = self.dates
+        return [
+            (ordinal, self.days[ordinal])
+            for ordinal in dates[bisect_left(dates, start) : bisect_left(dates, end)]
+        ]
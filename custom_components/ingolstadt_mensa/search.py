@@ -0,0 +1,149 @@
+"""Inverted index for searching the retained meals."""
+
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+from .models import ALLERGENS, FLAGS
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping
+
+    from .models import DayMenu, Meal
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str | None) -> set[str]:
+    """Return the case-folded word tokens of a text."""
+    if not text:
+        return set()
+    return set(_TOKEN.findall(text.casefold()))
+
+
+class MealIndex:
+    """
+    Map name tokens and categories to the meals having them.
+
+    The index is updated per day, so a refresh only re-indexes the days whose
+    menu changed. Queries intersect the posting sets of their terms instead
+    of scanning every meal, and check flags and allergens against the masks
+    of the remaining meals.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._days: dict[int, DayMenu] = {}
+        self._day_docs: dict[int, list[int]] = {}
+        self._docs: dict[int, tuple[int, Meal]] = {}
+        self._next_doc = 0
+        self._tokens: defaultdict[str, set[int]] = defaultdict(set)
+        self._categories: defaultdict[str, set[int]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        """Return the number of indexed meals."""
+        return len(self._docs)
+
+    def _postings(self, meal: Meal) -> Iterator[tuple[defaultdict[str, set[int]], str]]:
+        """Yield the posting lists and terms a meal is indexed under."""
+        for token in tokenize(meal.name.de) | tokenize(meal.name.en):
+            yield self._tokens, token
+        if meal.category:
+            yield self._categories, meal.category.casefold()
+
+    def update(self, days: Mapping[int, DayMenu]) -> None:
+        """Re-index the days that were added, changed or dropped."""
+        for ordinal in [
+            ordinal
+            for ordinal, day_menu in self._days.items()
+            if days.get(ordinal) != day_menu
+        ]:
+            self._remove_day(ordinal)
+        for ordinal, day_menu in days.items():
+            if ordinal not in self._days:
+                self._add_day(ordinal, day_menu)
+
+    def _add_day(self, ordinal: int, day_menu: DayMenu) -> None:
+        docs = []
+        for meal in day_menu.meals:
+            doc = self._next_doc
+            self._next_doc += 1
+            self._docs[doc] = (ordinal, meal)
+            for postings, term in self._postings(meal):
+                postings[term].add(doc)
+            docs.append(doc)
+        self._days[ordinal] = day_menu
+        self._day_docs[ordinal] = docs
+
+    def _remove_day(self, ordinal: int) -> None:
+        for doc in self._day_docs.pop(ordinal):
+            _, meal = self._docs.pop(doc)
+            for postings, term in self._postings(meal):
+                docs = postings[term]
+                docs.discard(doc)
+                if not docs:
+                    del postings[term]
+        del self._days[ordinal]
+
+    def search(  # noqa: PLR0913
+        self,
+        *,
+        query: str | None = None,
+        category: str | None = None,
+        flags: Iterable[str] = (),
+        exclude_allergens: Iterable[str] = (),
+        price_group: str | None = None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+    ) -> list[tuple[int, Meal]]:
+        """
+        Return the ordinal date and meal of every match, ordered by date.
+
+        Meals must contain every query token and flag, and none of the
+        excluded allergens. A price range only matches meals with a price in
+        the given price group, and is ignored without one.
+        """
+        flag_mask = 0
+        for flag in flags:
+            if not (bit := FLAGS.bit(flag)):
+                # No meal has ever carried this flag
+                return []
+            flag_mask |= bit
+        allergen_mask = 0
+        for allergen in exclude_allergens:
+            allergen_mask |= ALLERGENS.bit(allergen)
+
+        required = [self._tokens.get(token, set()) for token in tokenize(query)]
+        if category:
+            required.append(self._categories.get(category.casefold(), set()))
+        if required:
+            required.sort(key=len)
+            docs = set(required[0])
+            for postings in required[1:]:
+                docs &= postings
+        else:
+            docs = self._docs.keys()
+
+        matches = sorted(
+            (
+                doc
+                for doc in docs
+                if self._docs[doc][1].is_eligible(allergen_mask, flag_mask)
+            ),
+            key=lambda doc: (self._docs[doc][0], doc),
+        )
+        if price_group is None or (min_price is None and max_price is None):
+            return [self._docs[doc] for doc in matches]
+
+        results = []
+        for doc in matches:
+            price = self._docs[doc][1].prices.get(price_group)
+            if price is None:
+                continue
+            if (min_price is None or price >= min_price) and (
+                max_price is None or price <= max_price
+            ):
+                results.append(self._docs[doc])
+        return results
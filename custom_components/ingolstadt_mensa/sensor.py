@@ -5,65 +5,204 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Any
 
 from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.const import Platform
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
 from .const import (
+    ATTR_FRESHNESS,
     CONF_LOCATION,
-    CONF_PRICE_GROUP,
     DOMAIN,
+    day_key,
+    day_label,
+    day_offset,
     format_location_name,
     slugify_location_name,
 )
+from .models import DEFAULT_ICON
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+    from datetime import datetime
+
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
     from .coordinator import THIMensaDataUpdateCoordinator
     from .data import THIMensaConfigEntry
+    from .models import SlotRender
 
 
 async def async_setup_entry(
-    _hass: HomeAssistant,
+    hass: HomeAssistant,
     entry: THIMensaConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up meal sensors based on the coordinator data."""
-    coordinator: THIMensaDataUpdateCoordinator = entry.runtime_data.coordinator
-    tracked: dict[tuple[str, int], MensaMealSensor] = {}
+    pool = MealSlotPool(hass, entry, async_add_entities)
+    pool.async_restore(
+        await entry.runtime_data.hub.async_get_idle_slots(entry.entry_id)
+    )
+    pool.async_sync()
+    entry.async_on_unload(
+        entry.runtime_data.coordinator.async_add_listener(pool.async_sync)
+    )
+
+
+def _parse_slot_unique_id(entry_id: str, unique_id: str) -> tuple[int, int] | None:
+    """Return the (day offset, slot index) encoded in a sensor unique ID."""
+    day, separator, number = unique_id.removeprefix(f"{entry_id}-").rpartition("-meal-")
+    if not separator:
+        return None
+    try:
+        return day_offset(day), int(number) - 1
+    except ValueError:
+        return None
 
-    def _sync_entities_from_data() -> None:
-        if not coordinator.data:
-            return
 
-        new_entities: list[MensaMealSensor] = []
+def _idle_slot_key(offset: int, slot_index: int) -> str:
+    """Return the key a slot's idle-since time is persisted under."""
+    return f"{offset}-{slot_index}"
 
-        # Always create exactly 5 entities for today's meals (fixed slots)
-        for slot_index in range(5):
-            key = ("today", slot_index)
-            if key in tracked:
-                continue
 
-            sensor = MensaMealSensor(coordinator, entry, slot_index, "today")
-            tracked[key] = sensor
-            new_entities.append(sensor)
+class MealSlotPool:
+    """
+    Keep one sensor per meal slot, sized to the actual menu.
+
+    A day's pool grows as soon as it has more meals than sensors. Slots that
+    stay unused for the configured retention are removed again, starting
+    from the last one. The idle-since times are persisted in the hub store,
+    so restarts do not reset the retention.
+    """
 
-        # Always create exactly 5 entities for tomorrow's meals (fixed slots)
-        for slot_index in range(5):
-            key = ("tomorrow", slot_index)
-            if key in tracked:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: THIMensaConfigEntry,
+        async_add_entities: AddEntitiesCallback,
+    ) -> None:
+        """Initialize an empty pool."""
+        self._hass = hass
+        self._entry = entry
+        self._coordinator = entry.runtime_data.coordinator
+        self._hub = entry.runtime_data.hub
+        self._async_add_entities = async_add_entities
+        self._retention = entry.runtime_data.slot_retention
+        self._offsets = range(entry.runtime_data.days_ahead + 1)
+        self._sizes: dict[int, int] = dict.fromkeys(self._offsets, 0)
+        self._idle: dict[int, dict[int, datetime]] = {
+            offset: {} for offset in self._offsets
+        }
+        self._sensors: dict[tuple[int, int], MensaMealSensor] = {}
+
+    @property
+    def sizes(self) -> dict[int, int]:
+        """Return the number of sensors per day offset."""
+        return dict(self._sizes)
+
+    @callback
+    def async_restore(self, idle_slots: Mapping[str, str]) -> None:
+        """Size the pool from the sensors and idle times of an earlier run."""
+        registry = er.async_get(self._hass)
+        for registry_entry in er.async_entries_for_config_entry(
+            registry, self._entry.entry_id
+        ):
+            if registry_entry.domain != Platform.SENSOR:
+                continue
+            slot = _parse_slot_unique_id(self._entry.entry_id, registry_entry.unique_id)
+            if slot is None:
                 continue
+            offset, slot_index = slot
+            if offset not in self._sizes:
+                # The horizon was shortened, the day will never be served again
+                registry.async_remove(registry_entry.entity_id)
+                continue
+            self._sizes[offset] = max(self._sizes[offset], slot_index + 1)
+
+        for offset, size in self._sizes.items():
+            for slot_index in range(size):
+                since = idle_slots.get(_idle_slot_key(offset, slot_index))
+                if since and (idle_since := dt_util.parse_datetime(since)):
+                    self._idle[offset][slot_index] = dt_util.as_utc(idle_since)
+
+        new_entities = [
+            self._create(offset, slot_index)
+            for offset, size in self._sizes.items()
+            for slot_index in range(size)
+        ]
+        if new_entities:
+            self._async_add_entities(new_entities)
 
-            sensor = MensaMealSensor(coordinator, entry, slot_index, "tomorrow")
-            tracked[key] = sensor
-            new_entities.append(sensor)
+    @callback
+    def async_sync(self) -> None:
+        """Grow or retire slots to match the coordinator data."""
+        menu = self._coordinator.data
+        if not menu:
+            return
+
+        now = dt_util.utcnow()
+        idle_changed = False
+        new_entities: list[MensaMealSensor] = []
+        for offset in self._offsets:
+            day_menu = menu.day(offset)
+            needed = len(day_menu.meals) if day_menu else 0
+            size = self._sizes[offset]
+
+            new_entities.extend(
+                self._create(offset, slot_index) for slot_index in range(size, needed)
+            )
+            self._sizes[offset] = size = max(size, needed)
+
+            # Only the slots past the current menu can be idle, so the work
+            # here is proportional to the number of idle slots.
+            idle = self._idle[offset]
+            for slot_index in [index for index in idle if index < needed]:
+                del idle[slot_index]
+                idle_changed = True
+            for slot_index in range(needed, size):
+                if slot_index not in idle:
+                    idle[slot_index] = now
+                    idle_changed = True
+
+            while size > needed and now - idle[size - 1] >= self._retention:
+                size -= 1
+                del idle[size]
+                idle_changed = True
+                self._retire(offset, size)
+            self._sizes[offset] = size
 
         if new_entities:
-            async_add_entities(new_entities)
+            self._async_add_entities(new_entities)
+        if idle_changed:
+            self._hub.async_set_idle_slots(
+                self._entry.entry_id,
+                {
+                    _idle_slot_key(offset, slot_index): since.isoformat()
+                    for offset, idle in self._idle.items()
+                    for slot_index, since in idle.items()
+                },
+            )
+
+    def _create(self, offset: int, slot_index: int) -> MensaMealSensor:
+        """Create the sensor of a slot."""
+        sensor = MensaMealSensor(
+            self._coordinator, self._entry, slot_index, day_key(offset)
+        )
+        self._sensors[(offset, slot_index)] = sensor
+        return sensor
 
-    _sync_entities_from_data()
-    entry.async_on_unload(coordinator.async_add_listener(_sync_entities_from_data))
+    @callback
+    def _retire(self, offset: int, slot_index: int) -> None:
+        """Remove the sensor of a slot, including its registry entry."""
+        sensor = self._sensors.pop((offset, slot_index))
+        registry = er.async_get(self._hass)
+        if registry.async_get(sensor.entity_id):
+            registry.async_remove(sensor.entity_id)
+        else:
+            self._hass.async_create_task(sensor.async_remove())
 
 
 class MensaMealSensor(CoordinatorEntity, SensorEntity):
@@ -83,6 +222,8 @@ class MensaMealSensor(CoordinatorEntity, SensorEntity):
         self._config_entry = entry
         self._slot_index = slot_index
         self._day = day
+        offset = day_offset(day)
+        self._slot_key = (offset, slot_index)
 
         location = entry.options.get(
             CONF_LOCATION, entry.data.get(CONF_LOCATION, "IngolstadtMensa")
@@ -92,13 +233,13 @@ class MensaMealSensor(CoordinatorEntity, SensorEntity):
         # Force a static entity_id that only depends on location, day and slot
         self.entity_id = f"sensor.{self._location_slug}_{day}_{slot_index + 1}"
 
-        # Create separate devices for today and tomorrow
-        day_label = "Tomorrow" if day == "tomorrow" else "Today"
-        device_name = f"{base_device_name} - {day_label}"
+        # Create a separate device for each day
+        label = day_label(offset)
+        device_name = f"{base_device_name} - {label}"
 
         device_identifier = f"{location}-{day}"
 
-        self._fallback_name = f"{base_device_name} {day_label} #{slot_index + 1}"
+        self._fallback_name = f"{base_device_name} {label} #{slot_index + 1}"
         self._attr_unique_id = f"{entry.entry_id}-{day}-meal-{slot_index + 1}"
         self._attr_suggested_object_id = f"{self._location_slug}_{day}_{slot_index + 1}"
         self._attr_device_info = DeviceInfo(
@@ -107,85 +248,28 @@ class MensaMealSensor(CoordinatorEntity, SensorEntity):
             entry_type=DeviceEntryType.SERVICE,
         )
         self._attr_state_class = SensorStateClass.MEASUREMENT
-
-    @staticmethod
-    def _get_category_icon(category: str | None) -> str:
-        """Return Home Assistant icon based on meal category."""
-        if not category:
-            return "mdi:food"
-
-        category_lower = category.lower()
-
-        # Map categories to icons
-        icon_map = {
-            "main": "mdi:silverware-fork-knife",
-            "salad": "mdi:bowl-mix",
-            "desert": "mdi:cake",
-            "dessert": "mdi:cake",  # Handle correct spelling too
-            "soup": "mdi:bowl",
-        }
-
-        return icon_map.get(category_lower, "mdi:food")
-
-    @staticmethod
-    def _strip_restaurant_prefix(name: str | None) -> str | None:
-        """Remove the leading restaurant label from a meal name."""
-        if not name:
-            return name
-
-        normalized = name.strip()
-        # Try various prefix formats (case-insensitive)
-        prefixes = ("thi mensa", "ingolstadt mensa")
-        normalized_lower = normalized.lower()
-        for prefix in prefixes:
-            if normalized_lower.startswith(prefix):
-                remaining = normalized[len(prefix) :].lstrip(" :-")
-                if remaining:
-                    normalized = remaining
-                break
-
-        return normalized
-
-    def _get_preferred_language(self) -> str:
-        """Get the user's preferred language (de or en)."""
-        try:
-            language = self.coordinator.hass.config.language
-            if language and language.lower().startswith("de"):
-                return "de"
-        except (AttributeError, TypeError):
-            pass
-        return "en"
-
-    def _get_meal_name(self, name_data: dict[str, Any]) -> str | None:
-        """Get meal name in the user's preferred language with fallback."""
-        preferred_lang = self._get_preferred_language()
-        fallback_lang = "de" if preferred_lang == "en" else "en"
-
-        # Try preferred language first, then fallback
-        name = name_data.get(preferred_lang) or name_data.get(fallback_lang)
-        return self._strip_restaurant_prefix(name) if name else None
-
-    @property
-    def _selected_price_group(self) -> str:
-        return self._config_entry.options.get(
-            CONF_PRICE_GROUP, self._config_entry.data[CONF_PRICE_GROUP]
-        )
+        self._attributes_key: tuple[Any, ...] | None = None
+        self._attributes: Mapping[str, Any] = {}
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state if the slot changed and count the write for diagnostics."""
+        changed_slots = self.coordinator.changed_slots
+        if changed_slots is not None and self._slot_key not in changed_slots:
+            return
+        self.coordinator.entity_writes += 1
+        super()._handle_coordinator_update()
 
     @property
-    def _meal(self) -> dict[str, Any] | None:
+    def _render(self) -> SlotRender | None:
         if not self.coordinator.data:
             return None
-
-        day_data = self.coordinator.data.get(self._day, {})
-        meals = day_data.get("meals", [])
-        if self._slot_index < len(meals):
-            return meals[self._slot_index]
-        return None
+        return self.coordinator.data.slots.get(self._slot_key)
 
     @property
     def available(self) -> bool:
-        """Return whether the meal still exists in the coordinator data."""
-        return self._meal is not None
+        """Return whether the meal exists in data that may still be served."""
+        return super().available and self._render is not None
 
     @property
     def name(self) -> str | None:
@@ -195,33 +279,26 @@ class MensaMealSensor(CoordinatorEntity, SensorEntity):
         The entity ID stays static through suggested_object_id while the
         friendly name reflects the current meal title.
         """
-        meal = self._meal
-        if meal:
-            meal_name = self._get_meal_name(meal.get("name") or {})
-            if meal_name:
-                return meal_name
+        render = self._render
+        if render and render.name:
+            return render.name
         return self._fallback_name
 
     @property
     def icon(self) -> str:
         """Return icon based on meal category."""
-        meal = self._meal
-        if not meal:
-            return "mdi:food"
-        category = meal.get("category")
-        return self._get_category_icon(category)
+        render = self._render
+        if not render:
+            return DEFAULT_ICON
+        return render.icon
 
     @property
     def native_value(self) -> float | None:
         """Return the selected price group value."""
-        meal = self._meal
-        if not meal:
-            return None
-        prices = meal.get("prices") or {}
-        price = prices.get(self._selected_price_group)
-        if price is None:
+        render = self._render
+        if not render:
             return None
-        return round(float(price), 2)
+        return render.native_value
 
     @property
     def suggested_display_precision(self) -> int:
@@ -234,42 +311,20 @@ class MensaMealSensor(CoordinatorEntity, SensorEntity):
         return "EUR"
 
     @property
-    def extra_state_attributes(self) -> dict[str, Any]:
+    def extra_state_attributes(self) -> Mapping[str, Any]:
         """Provide detailed metadata about the meal."""
-        meal = self._meal
-        if not meal:
+        render = self._render
+        if not render:
             return {}
-        name_data = meal.get("name") or {}
-        prices = meal.get("prices") or {}
-
-        # Get all price tiers
-        price_student = prices.get("student")
-        price_employee = prices.get("employee")
-        price_guest = prices.get("guest")
-
-        # Get the currently selected price group's price
-        selected_price = prices.get(self._selected_price_group)
-
-        attributes = {
-            "name_de": name_data.get("de"),
-            "name_en": name_data.get("en"),
-            "category": meal.get("category"),
-            "restaurant": meal.get("restaurant"),
-            "allergens": meal.get("allergens"),
-            "flags": meal.get("flags"),
-            "date": self.coordinator.data.get(self._day, {}).get("timestamp"),
-            "price": (
-                round(float(selected_price), 2) if selected_price is not None else None
-            ),
-            "price_student": (
-                round(float(price_student), 2) if price_student is not None else None
-            ),
-            "price_employee": (
-                round(float(price_employee), 2) if price_employee is not None else None
-            ),
-            "price_guest": (
-                round(float(price_guest), 2) if price_guest is not None else None
-            ),
-        }
-
-        return attributes
+        coordinator = self.coordinator
+        key = (render, coordinator.freshness)
+        # Compare by identity, the render record is replaced on every change
+        if self._attributes_key is None or any(
+            new is not old for new, old in zip(key, self._attributes_key, strict=True)
+        ):
+            self._attributes_key = key
+            self._attributes = {
+                **render.attributes,
+                ATTR_FRESHNESS: coordinator.freshness,
+            }
+        return self._attributes
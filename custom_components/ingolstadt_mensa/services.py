@@ -0,0 +1,107 @@
+"""Services of the Ingolstadt Mensa integration."""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+from homeassistant.core import SupportsResponse, callback
+from homeassistant.helpers import config_validation as cv
+
+from .const import DOMAIN, PRICE_GROUPS
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse
+
+    from .models import Meal
+
+SERVICE_SEARCH_MEALS = "search_meals"
+
+ATTR_QUERY = "query"
+ATTR_CATEGORY = "category"
+ATTR_FLAGS = "flags"
+ATTR_EXCLUDE_ALLERGENS = "exclude_allergens"
+ATTR_PRICE_GROUP = "price_group"
+ATTR_MIN_PRICE = "min_price"
+ATTR_MAX_PRICE = "max_price"
+
+SEARCH_MEALS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_QUERY): cv.string,
+        vol.Optional(ATTR_CATEGORY): cv.string,
+        vol.Optional(ATTR_FLAGS, default=list): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_EXCLUDE_ALLERGENS, default=list): vol.All(
+            cv.ensure_list, [cv.string]
+        ),
+        vol.Optional(ATTR_PRICE_GROUP): vol.In(PRICE_GROUPS),
+        vol.Optional(ATTR_MIN_PRICE): vol.Coerce(float),
+        vol.Optional(ATTR_MAX_PRICE): vol.Coerce(float),
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SEARCH_MEALS,
+        async_search_meals,
+        schema=SEARCH_MEALS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+def _meal_result(
+    meal: Meal, ordinal: int, location: str, language: str, price_group: str
+) -> dict[str, Any]:
+    """Return the response entry of a matching meal."""
+    prices = meal.prices
+    return {
+        "location": location,
+        "date": date.fromordinal(ordinal).isoformat(),
+        "name": meal.name.resolve(language),
+        "name_de": meal.name.de,
+        "name_en": meal.name.en,
+        "category": meal.category,
+        "restaurant": meal.restaurant,
+        "price": prices.get(price_group),
+        "price_student": prices.student,
+        "price_employee": prices.employee,
+        "price_guest": prices.guest,
+        "allergens": list(meal.allergens),
+        "flags": list(meal.flags),
+    }
+
+
+async def async_search_meals(call: ServiceCall) -> ServiceResponse:
+    """Find the retained meals of every location that match the criteria."""
+    results: list[tuple[int, str, dict[str, Any]]] = []
+    for entry in call.hass.config_entries.async_loaded_entries(DOMAIN):
+        runtime_data = entry.runtime_data
+        menu = runtime_data.coordinator.data
+        if menu is None:
+            continue
+        price_group = call.data.get(ATTR_PRICE_GROUP, runtime_data.price_group)
+        matches = runtime_data.coordinator.index.search(
+            query=call.data.get(ATTR_QUERY),
+            category=call.data.get(ATTR_CATEGORY),
+            flags=call.data[ATTR_FLAGS],
+            exclude_allergens=call.data[ATTR_EXCLUDE_ALLERGENS],
+            price_group=price_group,
+            min_price=call.data.get(ATTR_MIN_PRICE),
+            max_price=call.data.get(ATTR_MAX_PRICE),
+        )
+        results.extend(
+            (
+                ordinal,
+                runtime_data.location,
+                _meal_result(
+                    meal, ordinal, runtime_data.location, menu.language, price_group
+                ),
+            )
+            for ordinal, meal in matches
+        )
+    results.sort(key=lambda result: result[:2])
+    return {"meals": [meal for _, _, meal in results]}
@@ -0,0 +1,187 @@
+"""Per-phase latency and payload instrumentation for API requests."""
+
+from __future__ import annotations
+
+import json
+import math
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+
+if TYPE_CHECKING:
+    from types import SimpleNamespace
+
+PHASE_DNS = "dns"
+PHASE_CONNECT = "connect"
+PHASE_TTFB = "ttfb"
+PHASE_DOWNLOAD = "download"
+PHASE_DECODE = "decode"
+PHASE_TOTAL = "total"
+PHASES = (
+    PHASE_DNS,
+    PHASE_CONNECT,
+    PHASE_TTFB,
+    PHASE_DOWNLOAD,
+    PHASE_DECODE,
+    PHASE_TOTAL,
+)
+
+BYTES_SENT = "bytes_sent"
+BYTES_RECEIVED = "bytes_received"
+
+HISTOGRAM_SIZE = 100
+
+
+class RollingHistogram:
+    """Keep the most recent samples of a measurement."""
+
+    def __init__(self, size: int = HISTOGRAM_SIZE) -> None:
+        """Initialize an empty histogram."""
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        """Return the number of retained samples."""
+        return len(self._samples)
+
+    def add(self, value: float) -> None:
+        """Add a sample, dropping the oldest one when full."""
+        self._samples.append(value)
+
+    @property
+    def last(self) -> float | None:
+        """Return the most recent sample."""
+        return self._samples[-1] if self._samples else None
+
+    def percentile(self, percent: float) -> float | None:
+        """Return the nearest-rank percentile of the retained samples."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+        return ordered[rank - 1]
+
+    def summary(self) -> dict[str, Any]:
+        """Return count, mean and percentiles of the retained samples."""
+        if not self._samples:
+            return {"count": 0}
+        return {
+            "count": len(self._samples),
+            "last": round(self._samples[-1], 3),
+            "mean": round(sum(self._samples) / len(self._samples), 3),
+            "p50": round(self.percentile(50), 3),
+            "p95": round(self.percentile(95), 3),
+            "max": round(max(self._samples), 3),
+        }
+
+
+class _TimedJsonDecoder:
+    """JSON decoder for ClientResponse.json that measures itself."""
+
+    __slots__ = ("duration",)
+
+    def __init__(self) -> None:
+        # Stays None unless the response was decoded through the decoder
+        self.duration: float | None = None
+
+    def __call__(self, text: str) -> Any:
+        started = time.perf_counter()
+        data = json.loads(text)
+        self.duration = time.perf_counter() - started
+        return data
+
+
+class RequestTracer:
+    """
+    Record how long each phase of an API request takes.
+
+    DNS resolution, connecting (including TLS) and time to first byte come
+    from an aiohttp TraceConfig, while the client reports download and
+    decode times itself. Durations are kept in milliseconds.
+    """
+
+    def __init__(self, size: int = HISTOGRAM_SIZE) -> None:
+        """Initialize empty histograms."""
+        self.histograms: dict[str, RollingHistogram] = {
+            name: RollingHistogram(size)
+            for name in (*PHASES, BYTES_SENT, BYTES_RECEIVED)
+        }
+        self.trace_config = aiohttp.TraceConfig()
+        self.trace_config.on_request_start.append(self._on_request_start)
+        self.trace_config.on_dns_resolvehost_start.append(self._on_dns_start)
+        self.trace_config.on_dns_resolvehost_end.append(self._on_dns_end)
+        self.trace_config.on_connection_create_start.append(self._on_connect_start)
+        self.trace_config.on_connection_create_end.append(self._on_connect_end)
+        self.trace_config.on_request_chunk_sent.append(self._on_chunk_sent)
+        self.trace_config.on_request_end.append(self._on_request_end)
+
+    def _record(self, name: str, value: float) -> None:
+        self.histograms[name].add(value)
+
+    def _record_since(self, name: str, started: float) -> None:
+        self._record(name, (time.perf_counter() - started) * 1000)
+
+    async def _on_request_start(
+        self, _session: aiohttp.ClientSession, context: SimpleNamespace, _params: Any
+    ) -> None:
+        context.started = time.perf_counter()
+        context.bytes_sent = 0
+
+    async def _on_dns_start(
+        self, _session: aiohttp.ClientSession, context: SimpleNamespace, _params: Any
+    ) -> None:
+        context.dns_started = time.perf_counter()
+
+    async def _on_dns_end(
+        self, _session: aiohttp.ClientSession, context: SimpleNamespace, _params: Any
+    ) -> None:
+        self._record_since(PHASE_DNS, context.dns_started)
+
+    async def _on_connect_start(
+        self, _session: aiohttp.ClientSession, context: SimpleNamespace, _params: Any
+    ) -> None:
+        context.connect_started = time.perf_counter()
+
+    async def _on_connect_end(
+        self, _session: aiohttp.ClientSession, context: SimpleNamespace, _params: Any
+    ) -> None:
+        self._record_since(PHASE_CONNECT, context.connect_started)
+
+    async def _on_chunk_sent(
+        self,
+        _session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        params: aiohttp.TraceRequestChunkSentParams,
+    ) -> None:
+        context.bytes_sent += len(params.chunk)
+
+    async def _on_request_end(
+        self, _session: aiohttp.ClientSession, context: SimpleNamespace, _params: Any
+    ) -> None:
+        # The request ends once the response headers have arrived
+        self._record_since(PHASE_TTFB, context.started)
+        self._record(BYTES_SENT, context.bytes_sent)
+
+    def json_decoder(self) -> _TimedJsonDecoder:
+        """Return a decoder that measures the decoding of one response."""
+        return _TimedJsonDecoder()
+
+    def record_response(
+        self,
+        started: float,
+        body_started: float,
+        size: int,
+        decoder: _TimedJsonDecoder,
+    ) -> None:
+        """Record the body phases of a response read with a timed decoder."""
+        now = time.perf_counter()
+        self._record(PHASE_TOTAL, (now - started) * 1000)
+        self._record(BYTES_RECEIVED, size)
+        if decoder.duration is not None:
+            self._record(PHASE_DOWNLOAD, (now - body_started - decoder.duration) * 1000)
+            self._record(PHASE_DECODE, decoder.duration * 1000)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Return a summary of every histogram."""
+        return {name: hist.summary() for name, hist in self.histograms.items()}
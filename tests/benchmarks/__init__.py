@@ -0,0 +1 @@
+"""Benchmarks for the parse and render hot paths."""
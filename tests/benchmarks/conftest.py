@@ -0,0 +1,58 @@
+"""Fixtures for benchmarks."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+from unittest.mock import MagicMock, patch
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.ingolstadt_mensa.coordinator import (
+    THIMensaDataUpdateCoordinator,
+)
+from custom_components.ingolstadt_mensa.hub import THIMensaHub
+
+if TYPE_CHECKING:
+    from datetime import date
+
+# (days, meals per day) of a single location, from a quiet to a busy canteen
+DAY_SCALES = [(1, 5), (7, 40), (14, 200)]
+LOCATION_SCALES = [1, 10, 50]
+
+
+@pytest.fixture
+def today() -> date:
+    """Return the local date payloads start at."""
+    return dt_util.now().date()
+
+
+@pytest.fixture
+def make_coordinator(mock_store):
+    """Return a factory for a coordinator wired to a hub like a real entry."""
+    with patch("homeassistant.helpers.frame.report_usage"):
+
+        def _make(location: str, days_ahead: int) -> THIMensaDataUpdateCoordinator:
+            hub = THIMensaHub(MagicMock(), MagicMock())
+            hub.async_add_location(location)
+            coordinator = THIMensaDataUpdateCoordinator(
+                hass=MagicMock(), logger=MagicMock(), name="benchmark"
+            )
+            entry = MagicMock()
+            entry.entry_id = "benchmark"
+            entry.data = {"location": location, "price_group": "student"}
+            entry.options = {}
+            entry.runtime_data = SimpleNamespace(
+                coordinator=coordinator,
+                hub=hub,
+                location=location,
+                price_group="student",
+                days_ahead=days_ahead,
+                excluded_allergens=0,
+                required_flags=0,
+            )
+            coordinator.config_entry = entry
+            return coordinator
+
+        yield _make
@@ -0,0 +1,87 @@
+"""Deterministic synthetic API payloads for benchmarks."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Any
+
+CATEGORIES = ("main", "salad", "soup", "dessert", "side")
+ALLERGENS = ("gluten", "milk", "eggs", "nuts", "soy", "celery", "mustard")
+FLAGS = ("vegetarian", "vegan", "pork", "beef", "poultry", "fish", "regional")
+
+
+def location_names(count: int) -> list[str]:
+    """Return the names of the given number of locations."""
+    return [f"Mensa{index:02d}" for index in range(count)]
+
+
+def generate_meal(
+    location: str, day: int, index: int, *, variants: bool = True
+) -> dict[str, Any]:
+    """Return one meal shaped like the API response."""
+    meal_id = f"{location}-{day}-{index}"
+    price = 2.0 + (index % 9) * 0.35
+    meal: dict[str, Any] = {
+        "id": meal_id,
+        "mealId": f"meal-{index}",
+        "category": CATEGORIES[index % len(CATEGORIES)],
+        "restaurant": location,
+        "name": {
+            "de": f"{location} Mensa: Gericht {index} vom Tag {day}",
+            "en": f"{location} Mensa: Dish {index} of day {day}",
+        },
+        "prices": {
+            "student": round(price, 2),
+            "employee": round(price + 1.0, 2),
+            "guest": round(price + 2.0, 2),
+        },
+        "allergens": list(ALLERGENS[: index % len(ALLERGENS)]),
+        "flags": list(FLAGS[index % 3 : index % 3 + 2]),
+    }
+    if variants:
+        meal["variants"] = [
+            {
+                "id": f"{meal_id}-v{variant}",
+                "mealId": f"meal-{index}-v{variant}",
+                "restaurant": location,
+                "name": {"de": f"Beilage {variant}", "en": f"Side {variant}"},
+                "prices": {"student": 0.5, "employee": 0.8, "guest": 1.0},
+                "allergens": [],
+                "flags": ["vegan"],
+                "additional": True,
+                "originalLanguage": "de",
+                "static": False,
+                "parent": {
+                    "id": meal_id,
+                    "category": meal["category"],
+                    "name": meal["name"],
+                },
+            }
+            for variant in range(index % 3)
+        ]
+    return meal
+
+
+def generate_food(
+    locations: int,
+    days: int,
+    meals_per_day: int,
+    *,
+    start: date,
+    variants: bool = True,
+) -> dict[str, Any]:
+    """Return a batched food response for the given scale."""
+    return {
+        "foodData": [
+            {
+                "timestamp": f"{(start + timedelta(days=day)).isoformat()}T00:00:00Z",
+                "meals": [
+                    generate_meal(location, day, index, variants=variants)
+                    for location in location_names(locations)
+                    for index in range(meals_per_day)
+                ],
+            }
+            for day in range(days)
+        ],
+        "errors": [],
+    }
@@ -0,0 +1,76 @@
+"""Benchmarks for decoding and indexing API payloads."""
+
+from __future__ import annotations
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.ingolstadt_mensa.coordinator import (
+    _decode_food_data,
+    _parse_entry_date,
+    _parse_entry_date_cached,
+    _parse_entry_date_generic,
+)
+from custom_components.ingolstadt_mensa.hub import _partition_food_data
+from custom_components.ingolstadt_mensa.models import MensaMenu
+
+from .conftest import DAY_SCALES, LOCATION_SCALES
+from .payloads import generate_food, location_names
+
+
+TIMESTAMPS = ["2025-01-15T00:00:00Z", "2025-01-15T00:00:00+01:00", "2025-01-15"]
+
+
+@pytest.mark.parametrize("timestamp", TIMESTAMPS)
+def test_parse_entry_date(benchmark, timestamp):
+    """Time parsing one foodData timestamp through the memo."""
+    assert benchmark(_parse_entry_date, timestamp) is not None
+
+
+@pytest.mark.parametrize("timestamp", TIMESTAMPS)
+def test_parse_entry_date_uncached(benchmark, timestamp):
+    """Time the fast path without the memo."""
+    time_zone = dt_util.get_default_time_zone()
+
+    assert benchmark(_parse_entry_date_cached.__wrapped__, timestamp, time_zone)
+
+
+@pytest.mark.parametrize("timestamp", TIMESTAMPS)
+def test_parse_entry_date_generic(benchmark, timestamp):
+    """Time the generic Home Assistant parser the fast path replaces."""
+    assert benchmark(_parse_entry_date_generic, timestamp) is not None
+
+
+@pytest.mark.parametrize("locations", LOCATION_SCALES)
+def test_partition_food_data(benchmark, today, locations):
+    """Time splitting a batched response into one foodData list per location."""
+    food = generate_food(locations, 7, 40, start=today)
+    names = location_names(locations)
+
+    result = benchmark(_partition_food_data, food["foodData"], names)
+
+    assert len(result) == locations
+
+
+@pytest.mark.parametrize(("days", "meals"), DAY_SCALES)
+def test_decode_food_data(benchmark, today, days, meals):
+    """Time decoding a location's foodData into the date index."""
+    food_data = generate_food(1, days, meals, start=today)["foodData"]
+
+    result = benchmark(_decode_food_data, food_data)
+
+    assert len(result) == days
+
+
+@pytest.mark.parametrize(("days", "meals"), DAY_SCALES)
+def test_build_menu(benchmark, today, days, meals):
+    """Time rendering every slot of the horizon from the date index."""
+    days_index = _decode_food_data(
+        generate_food(1, days, meals, start=today)["foodData"]
+    )
+
+    menu = benchmark(
+        MensaMenu.build, days_index, today.toordinal(), days - 1, "de", "student"
+    )
+
+    assert len(menu.slots) == days * meals
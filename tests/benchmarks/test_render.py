@@ -0,0 +1,88 @@
+"""Benchmarks for sensor properties and the refresh-to-state-write path."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from custom_components.ingolstadt_mensa.const import day_key
+from custom_components.ingolstadt_mensa.sensor import MensaMealSensor
+
+from .conftest import DAY_SCALES
+from .payloads import generate_food, location_names
+
+
+def _write_states(sensors: list[MensaMealSensor]) -> None:
+    """Read what a state write reads from every sensor."""
+    for sensor in sensors:
+        if sensor.available:
+            sensor.name  # noqa: B018
+            sensor.native_value  # noqa: B018
+            sensor.icon  # noqa: B018
+            sensor.extra_state_attributes  # noqa: B018
+
+
+def _sensors_for(coordinator, days: int, meals: int) -> list[MensaMealSensor]:
+    entry = coordinator.config_entry
+    return [
+        MensaMealSensor(coordinator, entry, index, day_key(offset))
+        for offset in range(days)
+        for index in range(meals)
+    ]
+
+
+@pytest.fixture
+def loaded_coordinator(make_coordinator, today):
+    """Return a coordinator serving one week with 40 meals per day."""
+    location = location_names(1)[0]
+    coordinator = make_coordinator(location, 6)
+    food_data = generate_food(1, 7, 40, start=today)["foodData"]
+    coordinator.data = coordinator._process_food_data(food_data)[0]
+    return coordinator
+
+
+@pytest.mark.parametrize(
+    "attribute", ["name", "native_value", "extra_state_attributes"]
+)
+def test_sensor_property(benchmark, loaded_coordinator, attribute):
+    """Time reading one sensor property."""
+    sensor = MensaMealSensor(
+        loaded_coordinator, loaded_coordinator.config_entry, 3, "today"
+    )
+
+    assert benchmark(getattr, sensor, attribute) is not None
+
+
+@pytest.mark.parametrize("scale", DAY_SCALES, ids=lambda scale: "{}-{}".format(*scale))
+@pytest.mark.parametrize("changed", [True, False], ids=["changed", "unchanged"])
+def test_refresh_to_state_write(benchmark, make_coordinator, today, scale, changed):
+    """Time a hub refresh fanned out to a coordinator and its sensor writes."""
+    days, meals = scale
+    location = location_names(1)[0]
+    coordinator = make_coordinator(location, days - 1)
+    hub = coordinator.config_entry.runtime_data.hub
+    hub.client.async_fetch_meals = AsyncMock(
+        return_value=generate_food(1, days, meals, start=today)
+    )
+    sensors = _sensors_for(coordinator, days, meals)
+    coordinator.async_add_listener(lambda: _write_states(sensors))
+    loop = asyncio.new_event_loop()
+
+    def _refresh() -> None:
+        loop.run_until_complete(hub.async_refresh())
+        coordinator.async_handle_hub_update()
+
+    def _setup() -> None:
+        if changed:
+            # Forget the digest, so the menu is decoded and rendered again
+            coordinator._digest = None
+
+    _refresh()
+    try:
+        benchmark.pedantic(_refresh, setup=_setup, rounds=10, warmup_rounds=1)
+    finally:
+        loop.close()
+
+    assert len(coordinator.data.slots) == days * meals
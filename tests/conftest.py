@@ -4,17 +4,20 @@ from __future__ import annotations
 
 import sys
 from pathlib import Path
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import aiohttp
 import pytest
 
 # Add the project root to the Python path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from custom_components.ingolstadt_mensa.api import THIMensaApiClient
+from custom_components.ingolstadt_mensa.api import RetryPolicy, THIMensaApiClient
 from custom_components.ingolstadt_mensa.const import DEFAULT_LOCATIONS, PRICE_GROUPS
 
+from .fake_neuland import FakeNeulandServer
+
 
 @pytest.fixture
 def mock_session():
@@ -24,8 +27,10 @@ def mock_session():
 
 @pytest.fixture
 def api_client(mock_session):
-    """Create an API client with a mocked session."""
-    return THIMensaApiClient(session=mock_session)
+    """Create an API client with a mocked session that retries without delay."""
+    return THIMensaApiClient(
+        session=mock_session, retry_policy=RetryPolicy(base_delay=0)
+    )
 
 
 @pytest.fixture
@@ -98,3 +103,32 @@ def mock_config_entry():
     }
     entry.options = {}
     return entry
+
+
+@pytest.fixture
+def mock_store():
+    """Patch the hub's menu cache store with an empty in-memory mock."""
+    with patch("custom_components.ingolstadt_mensa.hub.Store") as store_class:
+        store = store_class.return_value
+        store.async_load = AsyncMock(return_value=None)
+        store.async_delay_save = MagicMock()
+        yield store
+
+
+@pytest.fixture
+async def fake_neuland():
+    """Start a local stand-in for the Neuland GraphQL endpoint."""
+    async with FakeNeulandServer() as server:
+        yield server
+
+
+@pytest.fixture
+async def live_client(fake_neuland):
+    """Create an API client talking to the local endpoint over real HTTP."""
+    async with aiohttp.ClientSession() as session:
+        yield THIMensaApiClient(
+            session=session,
+            retry_policy=RetryPolicy(base_delay=0),
+            url=fake_neuland.url,
+            timeout=0.5,
+        )
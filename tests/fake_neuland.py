@@ -0,0 +1,127 @@
+"""Local stand-in for the Neuland GraphQL food endpoint with fault injection."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Any, Self
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from .benchmarks.payloads import generate_meal
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+
+@dataclass
+class Faults:
+    """Faults applied to the next requests, consumed in order."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Responses hang this many times, so the client runs into its timeout
+    hangs: int = 0
+    # HTTP status codes answered before the next successful response
+    statuses: list[int] = field(default_factory=list)
+    # Number of responses with a body that is not JSON
+    malformed: int = 0
+    # Per-location GraphQL errors, as the API reports closed canteens
+    location_errors: dict[str, str] = field(default_factory=dict)
+
+
+class FakeNeulandServer:
+    """
+    Serve deterministic menus for the requested locations.
+
+    Menus only depend on the location, the day and the configured size, so
+    repeated requests return identical payloads. Use as an async context
+    manager and point the API client at ``url``.
+    """
+
+    def __init__(
+        self,
+        *,
+        days: int = 7,
+        meals_per_day: int = 5,
+        start: date | None = None,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the server without starting it."""
+        self.days = days
+        self.meals_per_day = meals_per_day
+        self.start = start or date(2025, 1, 13)
+        self.faults = Faults()
+        self.requests: list[dict[str, Any]] = []
+        self._random = random.Random(seed)  # noqa: S311
+        app = web.Application()
+        app.router.add_post("/graphql", self._handle)
+        self._server = TestServer(app)
+
+    @property
+    def url(self) -> str:
+        """Return the URL of the GraphQL endpoint."""
+        return str(self._server.make_url("/graphql"))
+
+    async def __aenter__(self) -> Self:
+        """Start serving."""
+        await self._server.start_server()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop serving."""
+        await self._server.close()
+
+    def food(self, locations: list[str]) -> dict[str, Any]:
+        """Return the food object for the given locations."""
+        return {
+            "foodData": [
+                {
+                    "timestamp": f"{self.start + timedelta(days=day)}T00:00:00Z",
+                    "meals": [
+                        generate_meal(location, day, index, variants=False)
+                        for location in locations
+                        if location not in self.faults.location_errors
+                        for index in range(self.meals_per_day)
+                    ],
+                }
+                for day in range(self.days)
+            ],
+            "errors": [
+                {"location": location, "message": message}
+                for location, message in self.faults.location_errors.items()
+                if location in locations
+            ],
+        }
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        """Answer a GraphQL request, applying the pending faults."""
+        payload = await request.json()
+        self.requests.append(payload)
+        faults = self.faults
+
+        delay = faults.latency + self._random.uniform(0, faults.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if faults.hangs:
+            faults.hangs -= 1
+            await asyncio.sleep(3600)
+        if faults.statuses:
+            status = faults.statuses.pop(0)
+            return web.Response(status=status, text="Injected failure")
+        if faults.malformed:
+            faults.malformed -= 1
+            return web.Response(
+                text='{"data": {"food": ', content_type="application/json"
+            )
+
+        locations = payload["variables"]["locations"]
+        return web.json_response({"data": {"food": self.food(locations)}})
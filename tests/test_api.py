@@ -3,21 +3,35 @@
 from __future__ import annotations
 
 import json
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import aiohttp
 import pytest
 
 from custom_components.ingolstadt_mensa.api import (
+    DEFAULT_QUERY_FEATURES,
+    CircuitBreaker,
+    QueryFeature,
+    RetryPolicy,
+    THIMensaApiCircuitOpenError,
+    THIMensaApiClient,
     THIMensaApiCommunicationError,
     THIMensaApiResponseError,
+    build_meals_query,
 )
 
 
+def _mock_response() -> MagicMock:
+    """Return a response mock whose body can be read."""
+    response = MagicMock()
+    response.read = AsyncMock(return_value=b"{}")
+    return response
+
+
 @pytest.mark.asyncio
 async def test_async_fetch_meals_success(api_client, sample_api_response):
     """Test successful API fetch."""
-    mock_response = MagicMock()
+    mock_response = _mock_response()
     mock_response.json = AsyncMock(return_value=sample_api_response)
     mock_response.raise_for_status = MagicMock()
     api_client._session.post = AsyncMock(return_value=mock_response)
@@ -31,7 +45,7 @@ async def test_async_fetch_meals_success(api_client, sample_api_response):
 @pytest.mark.asyncio
 async def test_async_fetch_meals_multiple_locations(api_client, sample_api_response):
     """Test API fetch with multiple locations."""
-    mock_response = MagicMock()
+    mock_response = _mock_response()
     mock_response.json = AsyncMock(return_value=sample_api_response)
     mock_response.raise_for_status = MagicMock()
     api_client._session.post = AsyncMock(return_value=mock_response)
@@ -79,7 +93,7 @@ async def test_async_fetch_meals_socket_error(api_client):
 async def test_async_fetch_meals_api_errors(api_client):
     """Test API error response handling."""
     error_response = {"errors": [{"message": "Invalid location"}]}
-    mock_response = MagicMock()
+    mock_response = _mock_response()
     mock_response.json = AsyncMock(return_value=error_response)
     mock_response.raise_for_status = MagicMock()
     api_client._session.post = AsyncMock(return_value=mock_response)
@@ -92,7 +106,7 @@ async def test_async_fetch_meals_api_errors(api_client):
 async def test_async_fetch_meals_malformed_response(api_client):
     """Test malformed API response handling."""
     malformed_response = {"data": {}}  # Missing 'food' key
-    mock_response = MagicMock()
+    mock_response = _mock_response()
     mock_response.json = AsyncMock(return_value=malformed_response)
     mock_response.raise_for_status = MagicMock()
     api_client._session.post = AsyncMock(return_value=mock_response)
@@ -105,7 +119,7 @@ async def test_async_fetch_meals_malformed_response(api_client):
 async def test_async_fetch_meals_missing_data_key(api_client):
     """Test API response with missing data key."""
     malformed_response = {}  # Missing 'data' key entirely
-    mock_response = MagicMock()
+    mock_response = _mock_response()
     mock_response.json = AsyncMock(return_value=malformed_response)
     mock_response.raise_for_status = MagicMock()
     api_client._session.post = AsyncMock(return_value=mock_response)
@@ -117,7 +131,7 @@ async def test_async_fetch_meals_missing_data_key(api_client):
 @pytest.mark.asyncio
 async def test_async_fetch_meals_http_error(api_client):
     """Test HTTP error handling."""
-    mock_response = MagicMock()
+    mock_response = _mock_response()
     mock_response.raise_for_status = MagicMock(
         side_effect=aiohttp.ClientResponseError(
             request_info=MagicMock(),
@@ -137,7 +151,7 @@ async def test_async_fetch_meals_json_decode_error(api_client):
     """Test JSON decode error handling."""
     from custom_components.ingolstadt_mensa.api import THIMensaApiError
 
-    mock_response = MagicMock()
+    mock_response = _mock_response()
     mock_response.json = AsyncMock(
         side_effect=json.JSONDecodeError("Invalid JSON", "", 0)
     )
@@ -146,3 +160,247 @@ async def test_async_fetch_meals_json_decode_error(api_client):
 
     with pytest.raises(THIMensaApiError):
         await api_client.async_fetch_meals(["IngolstadtMensa"])
+
+
+@pytest.mark.asyncio
+async def test_async_fetch_meals_coalesces_concurrent_calls(
+    api_client, sample_api_response
+):
+    """Test concurrent calls for the same locations share one request."""
+    import asyncio
+
+    release = asyncio.Event()
+    mock_response = _mock_response()
+    mock_response.json = AsyncMock(return_value=sample_api_response)
+    mock_response.raise_for_status = MagicMock()
+
+    async def _slow_post(*_args, **_kwargs):
+        await release.wait()
+        return mock_response
+
+    api_client._session.post = AsyncMock(side_effect=_slow_post)
+
+    first = asyncio.ensure_future(
+        api_client.async_fetch_meals(["IngolstadtMensa", "NeuburgMensa"])
+    )
+    second = asyncio.ensure_future(
+        api_client.async_fetch_meals(["NeuburgMensa", "IngolstadtMensa"])
+    )
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await first == await second == sample_api_response["data"]["food"]
+    api_client._session.post.assert_called_once()
+    assert api_client.stats.requests_issued == 1
+    assert api_client.stats.requests_coalesced == 1
+
+
+@pytest.mark.asyncio
+async def test_async_fetch_meals_coalesces_into_superset(api_client):
+    """Test a subset request reuses an in-flight request and is narrowed."""
+    import asyncio
+
+    release = asyncio.Event()
+    batched = {
+        "data": {
+            "food": {
+                "foodData": [
+                    {
+                        "timestamp": "2025-01-15T00:00:00Z",
+                        "meals": [
+                            {"id": "1", "restaurant": "IngolstadtMensa"},
+                            {"id": "2", "restaurant": "NeuburgMensa"},
+                        ],
+                    }
+                ],
+                "errors": [{"location": "NeuburgMensa", "message": "closed"}],
+            }
+        }
+    }
+    mock_response = _mock_response()
+    mock_response.json = AsyncMock(return_value=batched)
+    mock_response.raise_for_status = MagicMock()
+
+    async def _slow_post(*_args, **_kwargs):
+        await release.wait()
+        return mock_response
+
+    api_client._session.post = AsyncMock(side_effect=_slow_post)
+
+    batch = asyncio.ensure_future(
+        api_client.async_fetch_meals(["IngolstadtMensa", "NeuburgMensa"])
+    )
+    single = asyncio.ensure_future(api_client.async_fetch_meals(["IngolstadtMensa"]))
+    await asyncio.sleep(0)
+    release.set()
+
+    await batch
+    result = await single
+    assert [meal["id"] for meal in result["foodData"][0]["meals"]] == ["1"]
+    assert result["errors"] == []
+    api_client._session.post.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_async_fetch_meals_sequential_calls_not_coalesced(
+    api_client, sample_api_response
+):
+    """Test completed requests are not reused by later calls."""
+    mock_response = _mock_response()
+    mock_response.json = AsyncMock(return_value=sample_api_response)
+    mock_response.raise_for_status = MagicMock()
+    api_client._session.post = AsyncMock(return_value=mock_response)
+
+    await api_client.async_fetch_meals(["IngolstadtMensa"])
+    await api_client.async_fetch_meals(["IngolstadtMensa"])
+
+    assert api_client._session.post.call_count == 2
+    assert api_client.stats.requests_coalesced == 0
+
+
+def test_build_meals_query_selects_features():
+    """Test the query only selects the fields of the requested features."""
+    default = build_meals_query(DEFAULT_QUERY_FEATURES)
+    minimal = build_meals_query(frozenset({QueryFeature.NAME_EN}))
+    full = build_meals_query(frozenset(QueryFeature))
+
+    assert "variants" not in default
+    assert "originalLanguage" not in default
+    assert "name { de en }" in default
+    assert "allergens" in default
+    assert "name { en }" in minimal
+    assert "allergens" not in minimal
+    assert "flags" not in minimal
+    assert "variants {" in full
+    assert len(minimal) < len(default) < len(full)
+
+
+def test_build_meals_query_is_cached():
+    """Test the query string is built once per feature set."""
+    features = frozenset({QueryFeature.NAME_DE, QueryFeature.FLAGS})
+
+    assert build_meals_query(features) is build_meals_query(frozenset(features))
+
+
+@pytest.mark.asyncio
+async def test_async_fetch_meals_sends_feature_query(api_client, sample_api_response):
+    """Test the request carries the query built for the requested features."""
+    mock_response = _mock_response()
+    mock_response.json = AsyncMock(return_value=sample_api_response)
+    mock_response.raise_for_status = MagicMock()
+    api_client._session.post = AsyncMock(return_value=mock_response)
+    features = frozenset({QueryFeature.NAME_DE})
+
+    await api_client.async_fetch_meals(["IngolstadtMensa"], features)
+
+    payload = api_client._session.post.call_args.kwargs["json"]
+    assert payload["query"] == build_meals_query(features)
+    assert payload["variables"] == {"locations": ["IngolstadtMensa"]}
+
+
+def _failing_then(result, failures):
+    """Return a post mock failing with timeouts before answering with result."""
+    mock_response = _mock_response()
+    mock_response.json = AsyncMock(return_value=result)
+    mock_response.raise_for_status = MagicMock()
+    return AsyncMock(side_effect=[TimeoutError("Timeout")] * failures + [mock_response])
+
+
+@pytest.mark.asyncio
+async def test_async_fetch_meals_retries_transient_errors(
+    api_client, sample_api_response
+):
+    """Test transient failures are retried until the request succeeds."""
+    api_client._session.post = _failing_then(sample_api_response, 2)
+
+    result = await api_client.async_fetch_meals(["IngolstadtMensa"])
+
+    assert result == sample_api_response["data"]["food"]
+    assert api_client._session.post.call_count == 3
+    assert api_client.stats.retries == 2
+    assert api_client.circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_async_fetch_meals_retries_are_bounded(api_client):
+    """Test the last transient error is raised once all attempts are used."""
+    api_client._session.post = AsyncMock(side_effect=TimeoutError("Timeout"))
+
+    with pytest.raises(THIMensaApiCommunicationError, match="Timeout"):
+        await api_client.async_fetch_meals(["IngolstadtMensa"])
+
+    assert api_client._session.post.call_count == api_client.retry_policy.attempts
+
+
+@pytest.mark.asyncio
+async def test_async_fetch_meals_no_retry_for_client_errors(api_client):
+    """Test 4xx responses and error payloads are not retried."""
+    mock_response = _mock_response()
+    mock_response.raise_for_status = MagicMock(
+        side_effect=aiohttp.ClientResponseError(
+            request_info=MagicMock(), history=(), status=400, message="Bad Request"
+        )
+    )
+    api_client._session.post = AsyncMock(return_value=mock_response)
+
+    with pytest.raises(THIMensaApiCommunicationError):
+        await api_client.async_fetch_meals(["IngolstadtMensa"])
+
+    api_client._session.post.assert_called_once()
+    assert api_client.stats.retries == 0
+
+
+def test_retry_policy_delay_is_jittered_and_capped():
+    """Test backoff delays grow exponentially within the cap."""
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+
+    with patch(
+        "custom_components.ingolstadt_mensa.api.random.uniform",
+        side_effect=lambda _low, high: high,
+    ):
+        assert [policy.delay(retry) for retry in range(4)] == [1.0, 2.0, 4.0, 5.0]
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_opens_and_probes(mock_session, sample_api_response):
+    """Test the breaker rejects requests when open and closes after a probe."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    client = THIMensaApiClient(
+        session=mock_session,
+        retry_policy=RetryPolicy(attempts=1, base_delay=0),
+        circuit_breaker=breaker,
+    )
+    client._session.post = AsyncMock(side_effect=TimeoutError("Timeout"))
+
+    for _ in range(2):
+        with pytest.raises(THIMensaApiCommunicationError):
+            await client.async_fetch_meals(["IngolstadtMensa"])
+    assert breaker.state == CircuitBreaker.OPEN
+    assert client.stats.breaker_opened == 1
+
+    with pytest.raises(THIMensaApiCircuitOpenError):
+        await client.async_fetch_meals(["IngolstadtMensa"])
+    assert client._session.post.call_count == 2
+    assert client.stats.requests_rejected == 1
+
+    client._session.post = _failing_then(sample_api_response, 0)
+    with patch(
+        "custom_components.ingolstadt_mensa.api.time.monotonic",
+        return_value=breaker._opened_at + 60,
+    ):
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        await client.async_fetch_meals(["IngolstadtMensa"])
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 0
+
+
+def test_circuit_breaker_failed_probe_reopens():
+    """Test a failing half-open probe opens the breaker again."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    assert breaker.record_failure()
+    assert breaker.failures == 2
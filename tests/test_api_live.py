@@ -0,0 +1,84 @@
+"""End-to-end tests of the API client against the local Neuland stand-in."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from custom_components.ingolstadt_mensa.api import (
+    THIMensaApiCommunicationError,
+    THIMensaApiError,
+)
+
+
+@pytest.mark.asyncio
+async def test_live_fetch(live_client, fake_neuland):
+    """Test a request travels over HTTP and returns the generated menu."""
+    result = await live_client.async_fetch_meals(["IngolstadtMensa"])
+
+    assert result == fake_neuland.food(["IngolstadtMensa"])
+    assert fake_neuland.requests[0]["variables"] == {"locations": ["IngolstadtMensa"]}
+    assert "variants" not in fake_neuland.requests[0]["query"]
+
+
+@pytest.mark.asyncio
+async def test_live_location_errors(live_client, fake_neuland):
+    """Test per-location GraphQL errors are returned next to the other menus."""
+    fake_neuland.faults.location_errors = {"NeuburgMensa": "closed"}
+
+    result = await live_client.async_fetch_meals(["IngolstadtMensa", "NeuburgMensa"])
+
+    assert result["errors"] == [{"location": "NeuburgMensa", "message": "closed"}]
+    restaurants = {meal["restaurant"] for meal in result["foodData"][0]["meals"]}
+    assert restaurants == {"IngolstadtMensa"}
+
+
+@pytest.mark.asyncio
+async def test_live_retries_server_errors(live_client, fake_neuland):
+    """Test 5xx responses are retried until the endpoint recovers."""
+    fake_neuland.faults.statuses = [502, 503]
+
+    assert await live_client.async_fetch_meals(["Canisius"])
+    assert len(fake_neuland.requests) == 3
+    assert live_client.stats.retries == 2
+
+
+@pytest.mark.asyncio
+async def test_live_timeouts(live_client, fake_neuland):
+    """Test hanging responses end in a communication error after all retries."""
+    fake_neuland.faults.hangs = live_client.retry_policy.attempts
+
+    with pytest.raises(THIMensaApiCommunicationError, match="Timeout"):
+        await live_client.async_fetch_meals(["Canisius"])
+    assert len(fake_neuland.requests) == live_client.retry_policy.attempts
+
+
+@pytest.mark.asyncio
+async def test_live_malformed_body(live_client, fake_neuland):
+    """Test a body that is not JSON fails without being retried."""
+    fake_neuland.faults.malformed = 1
+
+    with pytest.raises(THIMensaApiError):
+        await live_client.async_fetch_meals(["Canisius"])
+    assert len(fake_neuland.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_live_throughput_with_latency(live_client, fake_neuland):
+    """Test concurrent callers are served by one request despite latency."""
+    fake_neuland.faults.latency = 0.05
+    fake_neuland.faults.jitter = 0.02
+    locations = ["IngolstadtMensa", "NeuburgMensa", "Reimanns", "Canisius"]
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(live_client.async_fetch_meals(locations) for _ in range(20))
+    )
+    elapsed = time.perf_counter() - started
+
+    assert all(result == results[0] for result in results)
+    assert len(fake_neuland.requests) == 1
+    assert live_client.stats.requests_coalesced == 19
+    assert elapsed < 0.5
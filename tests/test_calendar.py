@@ -0,0 +1,118 @@
+"""Tests for the menu calendar."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.ingolstadt_mensa.calendar import MensaCalendar
+from custom_components.ingolstadt_mensa.models import DayMenu, MensaMenu
+
+TODAY = date(2025, 1, 15)
+
+
+def _day(ordinal: int, *names: str) -> DayMenu:
+    """Return the menu of a day with one main dish per name."""
+    return DayMenu.from_api(
+        date.fromordinal(ordinal).isoformat(),
+        [
+            {
+                "id": f"{ordinal}-{index}",
+                "name": {"de": name, "en": name},
+                "prices": {"student": 3.5},
+                "flags": ["vegan"],
+            }
+            for index, name in enumerate(names)
+        ],
+    )
+
+
+def _local(day: date, at: time = time.min) -> datetime:
+    return datetime.combine(day, at, tzinfo=dt_util.get_default_time_zone())
+
+
+@pytest.fixture
+def calendar(mock_config_entry):
+    """Calendar over a menu with a gap on the day after tomorrow."""
+    today = TODAY.toordinal()
+    days = {
+        today + 3: _day(today + 3, "Pizza"),
+        today - 1: _day(today - 1, "Suppe"),
+        today: _day(today, "Nudeln", "Salat"),
+        today + 1: _day(today + 1, "Curry"),
+    }
+    coordinator = MagicMock()
+    coordinator.data = MensaMenu.build(days, today, 1, "de", "student")
+    mock_config_entry.runtime_data = MagicMock(price_group="student")
+    return MensaCalendar(coordinator, mock_config_entry)
+
+
+def test_menu_date_index(calendar):
+    """Test range queries return the retained days in order."""
+    menu = calendar.coordinator.data
+    today = TODAY.toordinal()
+
+    assert menu.dates == (today - 1, today, today + 1, today + 3)
+    assert [ordinal for ordinal, _ in menu.days_between(today, today + 3)] == [
+        today,
+        today + 1,
+    ]
+    assert menu.days_between(today + 2, today + 3) == []
+    assert menu.days_between(today + 4, today + 10) == []
+
+
+async def test_get_events(calendar):
+    """Test the events of every day overlapping the requested range."""
+    events = await calendar.async_get_events(
+        MagicMock(), _local(TODAY), _local(date(2025, 1, 17))
+    )
+
+    assert [(event.start, event.summary) for event in events] == [
+        (TODAY, "Nudeln"),
+        (TODAY, "Salat"),
+        (date(2025, 1, 16), "Curry"),
+    ]
+    event = events[0]
+    assert event.end == date(2025, 1, 16)
+    assert event.description == "3.50 EUR\nFlags: vegan"
+    assert event.location == "Ingolstadt Mensa"
+
+    # A range ending during a day includes that day
+    events = await calendar.async_get_events(
+        MagicMock(),
+        _local(date(2025, 1, 16), time(12)),
+        _local(date(2025, 1, 18), time(1)),
+    )
+    assert [event.summary for event in events] == ["Curry", "Pizza"]
+
+
+async def test_events_built_once_per_menu(calendar):
+    """Test repeated queries reuse the events until the menu is replaced."""
+    start, end = _local(TODAY), _local(date(2025, 1, 16))
+    first = await calendar.async_get_events(MagicMock(), start, end)
+    second = await calendar.async_get_events(MagicMock(), start, end)
+    assert first[0] is second[0]
+
+    menu = calendar.coordinator.data
+    calendar.coordinator.data = MensaMenu.build(
+        menu.days, menu.today, 1, "en", "student"
+    )
+    third = await calendar.async_get_events(MagicMock(), start, end)
+    assert third[0] is not first[0]
+
+
+def test_current_event(calendar):
+    """Test the state follows the first meal of today or the next menu day."""
+    assert calendar.event.summary == "Nudeln"
+
+    menu = calendar.coordinator.data
+    today = TODAY.toordinal()
+    days = {ordinal: menu.days[ordinal] for ordinal in (today - 1, today + 3)}
+    calendar.coordinator.data = MensaMenu.build(days, today, 1, "de", "student")
+    assert calendar.event.summary == "Pizza"
+
+    calendar.coordinator.data = None
+    assert calendar.event is None
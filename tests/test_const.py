@@ -3,6 +3,7 @@
 from custom_components.ingolstadt_mensa.const import (
     format_location_name,
     format_price_group_name,
+    slugify_location_name,
 )
 
 
@@ -21,3 +22,37 @@ def test_format_price_group_name():
     assert format_price_group_name("employee") == "Employee"
     assert format_price_group_name("guest") == "Guest"
     assert format_price_group_name("") == ""
+
+
+def test_slugify_location_name():
+    """Test location slugs used in entity IDs."""
+    assert slugify_location_name("IngolstadtMensa") == "ingolstadt_mensa"
+    assert slugify_location_name("Canisius") == "canisius"
+    assert slugify_location_name("Neuburg Mensa") == "neuburg_mensa"
+    assert slugify_location_name("") == "ingolstadt_mensa"
+
+
+def test_name_helpers_are_memoized():
+    """Test repeated calls are answered from the memo."""
+    slugify_location_name.cache_clear()
+    slugify_location_name("NeuburgMensa")
+    slugify_location_name("NeuburgMensa")
+
+    assert slugify_location_name.cache_info().hits == 1
+
+
+def test_day_key_round_trip():
+    """Test day keys map to offsets and back."""
+    from custom_components.ingolstadt_mensa.const import (
+        day_key,
+        day_label,
+        day_offset,
+    )
+
+    assert day_key(0) == "today"
+    assert day_key(1) == "tomorrow"
+    assert day_key(4) == "day_4"
+    for offset in range(7):
+        assert day_offset(day_key(offset)) == offset
+    assert day_label(1) == "Tomorrow"
+    assert day_label(2) == "In 2 days"
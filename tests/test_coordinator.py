@@ -6,13 +6,48 @@ from datetime import date, timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from homeassistant.helpers.update_coordinator import UpdateFailed
 from homeassistant.util import dt as dt_util
 
 from custom_components.ingolstadt_mensa.coordinator import (
     THIMensaDataUpdateCoordinator,
-    _filter_meals_by_date,
+    _decode_food_data,
     _parse_entry_date,
+    _parse_entry_date_cached,
+    _parse_entry_date_generic,
 )
+from custom_components.ingolstadt_mensa.hub import THIMensaHub
+from custom_components.ingolstadt_mensa.models import ALLERGENS, FLAGS, MensaMenu
+
+
+def _menu_for(food_data, days_ahead=1):
+    """Decode foodData and index it relative to today, as a refresh would."""
+    return MensaMenu.build(
+        _decode_food_data(food_data),
+        dt_util.now().date().toordinal(),
+        days_ahead,
+        "en",
+        "student",
+    )
+
+
+pytestmark = pytest.mark.usefixtures("mock_store")
+
+
+def _setup_runtime_data(entry, client, location):
+    """Attach runtime data with a hub that wraps the given client."""
+    hub = THIMensaHub(MagicMock(), client)
+    hub.async_add_location(location)
+    entry.runtime_data = MagicMock()
+    entry.runtime_data.client = client
+    entry.runtime_data.hub = hub
+    entry.runtime_data.location = location
+    entry.runtime_data.price_group = "student"
+    entry.runtime_data.days_ahead = 1
+    entry.runtime_data.staleness_budget = timedelta(hours=24)
+    entry.runtime_data.excluded_allergens = 0
+    entry.runtime_data.required_flags = 0
+    return hub
 
 
 def test_parse_entry_date():
@@ -38,8 +73,8 @@ def test_parse_entry_date():
     assert _parse_entry_date("invalid") is None
 
 
-def test_filter_meals_by_date():
-    """Test filtering meals by today and tomorrow."""
+def test_menu_by_date():
+    """Test indexing meals by date and rendering today and tomorrow."""
     today = dt_util.now().date()
     tomorrow = today + timedelta(days=1)
     yesterday = today - timedelta(days=1)
@@ -59,19 +94,19 @@ def test_filter_meals_by_date():
         },
     ]
 
-    result = _filter_meals_by_date(food_data)
+    menu = _menu_for(food_data)
 
-    assert "today" in result
-    assert "tomorrow" in result
-    assert len(result["today"]["meals"]) == 1
-    assert len(result["tomorrow"]["meals"]) == 1
-    assert result["today"]["meals"][0]["id"] == "today-meal-1"
-    assert result["tomorrow"]["meals"][0]["id"] == "tomorrow-meal-1"
-    assert result["today"]["timestamp"] == today.isoformat()
-    assert result["tomorrow"]["timestamp"] == tomorrow.isoformat()
+    assert len(menu.day(0).meals) == 1
+    assert len(menu.day(1).meals) == 1
+    assert menu.day(0).meals[0].id == "today-meal-1"
+    assert menu.day(1).meals[0].id == "tomorrow-meal-1"
+    assert menu.day(0).timestamp == today.isoformat()
+    assert menu.day(1).timestamp == tomorrow.isoformat()
+    assert menu.day(-1).meals[0].id == "old-meal"
+    assert set(menu.slots) == {(0, 0), (1, 0)}
 
 
-def test_filter_meals_by_date_no_matches():
+def test_menu_by_date_no_matches():
     """Test filtering when no meals match today or tomorrow."""
     yesterday = dt_util.now().date() - timedelta(days=1)
     last_week = yesterday - timedelta(days=7)
@@ -87,12 +122,11 @@ def test_filter_meals_by_date_no_matches():
         },
     ]
 
-    result = _filter_meals_by_date(food_data)
+    menu = _menu_for(food_data)
 
-    assert "today" in result
-    assert "tomorrow" in result
-    assert len(result["today"]["meals"]) == 0
-    assert len(result["tomorrow"]["meals"]) == 0
+    assert menu.day(0) is None
+    assert menu.day(1) is None
+    assert menu.slots == {}
 
 
 @pytest.mark.asyncio
@@ -112,17 +146,15 @@ async def test_coordinator_update_success(
     coordinator.config_entry = mock_config_entry
 
     # Mock the runtime data
-    mock_config_entry.runtime_data = MagicMock()
-    mock_config_entry.runtime_data.client = MagicMock(spec=THIMensaApiClient)
-    mock_config_entry.runtime_data.client.async_fetch_meals = AsyncMock(
-        return_value=sample_meal_data
-    )
-    mock_config_entry.runtime_data.location = "IngolstadtMensa"
+    client = MagicMock(spec=THIMensaApiClient)
+    client.async_fetch_meals = AsyncMock(return_value=sample_meal_data)
+    _setup_runtime_data(mock_config_entry, client, "IngolstadtMensa")
 
     result = await coordinator._async_update_data()
 
-    assert "today" in result
-    assert "tomorrow" in result
+    assert isinstance(result, MensaMenu)
+    assert result.today == dt_util.now().date().toordinal()
+    assert date(2025, 1, 15).toordinal() in result.days
 
 
 @pytest.mark.asyncio
@@ -143,17 +175,45 @@ async def test_coordinator_update_with_errors(mock_report, mock_config_entry):
     )
     coordinator.config_entry = mock_config_entry
 
-    mock_config_entry.runtime_data = MagicMock()
-    mock_config_entry.runtime_data.client = MagicMock(spec=THIMensaApiClient)
-    mock_config_entry.runtime_data.client.async_fetch_meals = AsyncMock(
+    client = MagicMock(spec=THIMensaApiClient)
+    client.async_fetch_meals = AsyncMock(
         side_effect=THIMensaApiResponseError("API error")
     )
-    mock_config_entry.runtime_data.location = "IngolstadtMensa"
+    _setup_runtime_data(mock_config_entry, client, "IngolstadtMensa")
 
     with pytest.raises(UpdateFailed):
         await coordinator._async_update_data()
 
 
+def test_parse_entry_date_time_zone_change():
+    """Test memoized dates follow a change of the Home Assistant time zone."""
+    from zoneinfo import ZoneInfo
+
+    original = dt_util.get_default_time_zone()
+    try:
+        dt_util.set_default_time_zone(ZoneInfo("Europe/Berlin"))
+        assert _parse_entry_date("2025-01-15T23:30:00Z") == date(2025, 1, 16)
+        dt_util.set_default_time_zone(ZoneInfo("America/New_York"))
+        assert _parse_entry_date("2025-01-15T23:30:00Z") == date(2025, 1, 15)
+        assert _parse_entry_date_cached.cache_info().currsize == 1
+    finally:
+        dt_util.set_default_time_zone(original)
+
+
+def test_parse_entry_date_matches_generic_parser():
+    """Test the fast path agrees with the generic Home Assistant parser."""
+    for timestamp in (
+        "2025-01-15",
+        "2025-01-15T00:00:00Z",
+        "2025-01-15T23:30:00Z",
+        "2025-01-15T00:30:00+02:00",
+        "2025-01-15T12:00:00",
+        "2025-01-15 12:00:00.123",
+        "2025-01-15T00:00:00.000Z",
+    ):
+        assert _parse_entry_date(timestamp) == _parse_entry_date_generic(timestamp)
+
+
 def test_parse_entry_date_various_formats():
     """Test date parsing with various timestamp formats."""
     # Test ISO format with Z
@@ -169,7 +229,7 @@ def test_parse_entry_date_various_formats():
     assert _parse_entry_date("2025-13-45") is None
 
 
-def test_filter_meals_by_date_multiple_entries_same_day():
+def test_menu_by_date_multiple_entries_same_day():
     """Test filtering when multiple entries exist for the same day."""
     today = dt_util.now().date()
 
@@ -184,24 +244,38 @@ def test_filter_meals_by_date_multiple_entries_same_day():
         },
     ]
 
-    result = _filter_meals_by_date(food_data)
+    menu = _menu_for(food_data)
 
     # Should use the last entry for today
-    assert len(result["today"]["meals"]) == 1
-    assert result["today"]["meals"][0]["id"] == "meal-2"
+    assert len(menu.day(0).meals) == 1
+    assert menu.day(0).meals[0].id == "meal-2"
 
 
-def test_filter_meals_by_date_empty_food_data():
+def test_menu_by_date_empty_food_data():
     """Test filtering with empty food data."""
-    result = _filter_meals_by_date([])
+    menu = _menu_for([])
+
+    assert menu.day(0) is None
+    assert menu.day(1) is None
+    assert menu.slots == {}
 
-    assert "today" in result
-    assert "tomorrow" in result
-    assert len(result["today"]["meals"]) == 0
-    assert len(result["tomorrow"]["meals"]) == 0
 
+def test_decode_applies_dietary_filter(sample_meal_data):
+    """Test only eligible meals are kept, so slots never hold filtered meals."""
+    days = _decode_food_data(
+        sample_meal_data["foodData"],
+        ALLERGENS.encode(["milk"]),
+        FLAGS.encode(["vegetarian"]),
+    )
+
+    assert [[meal.id for meal in day.meals] for day in days.values()] == [["2"], []]
+    vegan = _decode_food_data(sample_meal_data["foodData"], 0, FLAGS.encode(["vegan"]))
+    assert [len(day.meals) for day in vegan.values()] == [1, 0]
+    unfiltered = _decode_food_data(sample_meal_data["foodData"])
+    assert [len(day.meals) for day in unfiltered.values()] == [2, 1]
 
-def test_filter_meals_by_date_missing_timestamp():
+
+def test_menu_by_date_missing_timestamp():
     """Test filtering when entries have missing timestamps."""
     food_data = [
         {
@@ -213,10 +287,10 @@ def test_filter_meals_by_date_missing_timestamp():
         },
     ]
 
-    result = _filter_meals_by_date(food_data)
+    menu = _menu_for(food_data)
 
-    assert len(result["today"]["meals"]) == 0
-    assert len(result["tomorrow"]["meals"]) == 0
+    assert menu.days == {}
+    assert menu.slots == {}
 
 
 @pytest.mark.asyncio
@@ -239,12 +313,11 @@ async def test_coordinator_update_with_communication_error(
     )
     coordinator.config_entry = mock_config_entry
 
-    mock_config_entry.runtime_data = MagicMock()
-    mock_config_entry.runtime_data.client = MagicMock(spec=THIMensaApiClient)
-    mock_config_entry.runtime_data.client.async_fetch_meals = AsyncMock(
+    client = MagicMock(spec=THIMensaApiClient)
+    client.async_fetch_meals = AsyncMock(
         side_effect=THIMensaApiCommunicationError("Connection failed")
     )
-    mock_config_entry.runtime_data.location = "IngolstadtMensa"
+    _setup_runtime_data(mock_config_entry, client, "IngolstadtMensa")
 
     with pytest.raises(UpdateFailed):
         await coordinator._async_update_data()
@@ -267,12 +340,384 @@ async def test_coordinator_update_with_api_errors_in_response(
     )
     coordinator.config_entry = mock_config_entry
 
-    mock_config_entry.runtime_data = MagicMock()
-    mock_config_entry.runtime_data.client = MagicMock(spec=THIMensaApiClient)
-    mock_config_entry.runtime_data.client.async_fetch_meals = AsyncMock(
+    client = MagicMock(spec=THIMensaApiClient)
+    client.async_fetch_meals = AsyncMock(
         return_value={"errors": [{"message": "Invalid location"}]}
     )
-    mock_config_entry.runtime_data.location = "InvalidLocation"
+    _setup_runtime_data(mock_config_entry, client, "InvalidLocation")
 
     with pytest.raises(UpdateFailed):
         await coordinator._async_update_data()
+
+
+@pytest.mark.asyncio
+@patch("homeassistant.helpers.frame.report_usage")
+async def test_coordinator_handle_hub_update(
+    mock_report, mock_config_entry, sample_meal_data
+):
+    """Test the coordinator takes its slice from a hub refresh."""
+    from custom_components.ingolstadt_mensa.api import THIMensaApiClient
+
+    coordinator = THIMensaDataUpdateCoordinator(
+        hass=MagicMock(),
+        logger=MagicMock(),
+        name="test",
+    )
+    coordinator.config_entry = mock_config_entry
+
+    client = MagicMock(spec=THIMensaApiClient)
+    client.async_fetch_meals = AsyncMock(return_value=sample_meal_data)
+    hub = _setup_runtime_data(mock_config_entry, client, "IngolstadtMensa")
+
+    await hub.async_refresh()
+    coordinator.async_handle_hub_update()
+
+    assert coordinator.last_update_success
+    assert isinstance(coordinator.data, MensaMenu)
+
+    mock_config_entry.runtime_data.staleness_budget = timedelta(0)
+    hub.last_update_success = False
+    hub.last_exception = Exception("boom")
+    coordinator.async_handle_hub_update()
+
+    assert not coordinator.last_update_success
+
+
+@pytest.mark.asyncio
+@patch("homeassistant.helpers.frame.report_usage")
+async def test_coordinator_load_cached_data(mock_report, mock_config_entry, mock_store):
+    """Test the coordinator can start from the persisted menu."""
+    from custom_components.ingolstadt_mensa.api import THIMensaApiClient
+
+    today = dt_util.now().date()
+    mock_store.async_load.return_value = {
+        "locations": {
+            "IngolstadtMensa": {
+                "fetched_at": "2025-01-15T06:00:00",
+                "food_data": [
+                    {"timestamp": today.isoformat(), "meals": [{"id": "cached"}]}
+                ],
+            }
+        }
+    }
+    coordinator = THIMensaDataUpdateCoordinator(
+        hass=MagicMock(),
+        logger=MagicMock(),
+        name="test",
+    )
+    coordinator.config_entry = mock_config_entry
+    client = MagicMock(spec=THIMensaApiClient)
+    _setup_runtime_data(mock_config_entry, client, "IngolstadtMensa")
+
+    assert await coordinator.async_load_cached_data() is True
+    assert coordinator.data.day(0).meals[0].id == "cached"
+    client.async_fetch_meals.assert_not_called()
+
+    mock_config_entry.runtime_data.location = "Canisius"
+    assert await coordinator.async_load_cached_data() is False
+
+
+@pytest.mark.asyncio
+@patch("homeassistant.helpers.frame.report_usage")
+async def test_coordinator_skips_unchanged_menu(
+    mock_report, mock_config_entry, sample_meal_data
+):
+    """Test an unchanged menu is neither re-parsed nor sent to listeners."""
+    from custom_components.ingolstadt_mensa.api import THIMensaApiClient
+
+    coordinator = THIMensaDataUpdateCoordinator(
+        hass=MagicMock(),
+        logger=MagicMock(),
+        name="test",
+    )
+    coordinator.config_entry = mock_config_entry
+    client = MagicMock(spec=THIMensaApiClient)
+    client.async_fetch_meals = AsyncMock(return_value=sample_meal_data)
+    hub = _setup_runtime_data(mock_config_entry, client, "IngolstadtMensa")
+    listener = MagicMock()
+    coordinator.async_add_listener(listener)
+
+    await hub.async_refresh()
+    coordinator.async_handle_hub_update()
+    first_data = coordinator.data
+    await hub.async_refresh()
+    coordinator.async_handle_hub_update()
+
+    assert coordinator.data is first_data
+    assert coordinator.updates_applied == 1
+    assert coordinator.updates_skipped == 1
+    assert listener.call_count == 1
+
+    sample_meal_data["foodData"][0]["meals"][0]["prices"]["student"] = 3.0
+    await hub.async_refresh()
+    coordinator.async_handle_hub_update()
+
+    assert coordinator.updates_applied == 2
+    assert listener.call_count == 2
+
+
+@pytest.mark.asyncio
+@patch("homeassistant.helpers.frame.report_usage")
+async def test_coordinator_serves_stale_within_budget(
+    mock_report, mock_config_entry, sample_meal_data
+):
+    """Test failures keep the last menu as stale until the budget runs out."""
+    from custom_components.ingolstadt_mensa.api import THIMensaApiClient
+
+    coordinator = THIMensaDataUpdateCoordinator(
+        hass=MagicMock(),
+        logger=MagicMock(),
+        name="test",
+    )
+    coordinator.config_entry = mock_config_entry
+    client = MagicMock(spec=THIMensaApiClient)
+    client.async_fetch_meals = AsyncMock(return_value=sample_meal_data)
+    hub = _setup_runtime_data(mock_config_entry, client, "IngolstadtMensa")
+    listener = MagicMock()
+    coordinator.async_add_listener(listener)
+
+    await hub.async_refresh()
+    coordinator.async_handle_hub_update()
+    fetched_at = coordinator.last_successful_update
+    assert coordinator.freshness == "fresh"
+    assert fetched_at == hub.fetched_at("IngolstadtMensa")
+
+    hub.last_update_success = False
+    hub.last_exception = Exception("boom")
+    with patch(
+        "custom_components.ingolstadt_mensa.coordinator.async_call_later"
+    ) as mock_call_later:
+        coordinator.async_handle_hub_update()
+        coordinator.async_handle_hub_update()
+
+    assert coordinator.last_update_success
+    assert coordinator.freshness == "stale"
+    assert coordinator.last_successful_update == fetched_at
+    assert listener.call_count == 2
+    mock_call_later.assert_called_once()
+
+    with patch(
+        "custom_components.ingolstadt_mensa.coordinator.dt_util.utcnow",
+        return_value=fetched_at + timedelta(hours=24),
+    ):
+        coordinator.async_handle_hub_update()
+    assert not coordinator.last_update_success
+
+    hub.last_update_success = True
+    coordinator.async_handle_hub_update()
+    assert coordinator.last_update_success
+    assert coordinator.freshness == "fresh"
+    mock_call_later.return_value.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("homeassistant.helpers.frame.report_usage")
+async def test_coordinator_language_change(
+    mock_report, mock_config_entry, sample_meal_data
+):
+    """Test a changed Home Assistant language re-renders the names."""
+    from custom_components.ingolstadt_mensa.api import THIMensaApiClient
+
+    today = dt_util.now().date()
+    sample_meal_data["foodData"][0]["timestamp"] = today.isoformat()
+    sample_meal_data["foodData"][0]["meals"][1]["name"]["de"] = "Salat"
+    hass = MagicMock()
+    hass.config.language = "en"
+    coordinator = THIMensaDataUpdateCoordinator(
+        hass=hass, logger=MagicMock(), name="test"
+    )
+    coordinator.config_entry = mock_config_entry
+    client = MagicMock(spec=THIMensaApiClient)
+    client.async_fetch_meals = AsyncMock(return_value=sample_meal_data)
+    hub = _setup_runtime_data(mock_config_entry, client, "IngolstadtMensa")
+    listener = MagicMock()
+    coordinator.async_add_listener(listener)
+
+    coordinator.async_track_language()
+    config_updated = hass.bus.async_listen.call_args.args[1]
+    await hub.async_refresh()
+    coordinator.async_handle_hub_update()
+    assert coordinator.data.slots[(0, 1)].name == "Greek Salad"
+    assert ("2", "en") in coordinator._names
+
+    config_updated(MagicMock())
+    assert listener.call_count == 1
+
+    hass.config.language = "de"
+    config_updated(MagicMock())
+    assert coordinator.data.slots[(0, 1)].name == "Salat"
+    assert ("2", "en") not in coordinator._names
+    assert listener.call_count == 2
+
+
+def test_menu_renders_slots_once():
+    """Test every meal slot gets a render record with resolved values."""
+    from custom_components.ingolstadt_mensa.models import DayMenu
+
+    today = date(2025, 1, 15).toordinal()
+    days = {
+        today: DayMenu.from_api(
+            "2025-01-15",
+            [
+                {
+                    "id": "1",
+                    "category": "soup",
+                    "name": {"de": "THI Mensa: Suppe", "en": "Soup"},
+                    "prices": {"student": 2.004, "employee": 3.0},
+                }
+            ],
+        ),
+        today + 1: DayMenu.from_api("2025-01-16", []),
+    }
+
+    menu = MensaMenu.build(days, today, 1, "de", "employee")
+
+    render = menu.slots[(0, 0)]
+    assert list(menu.slots) == [(0, 0)]
+    assert render.name == "Suppe"
+    assert render.icon == "mdi:bowl"
+    assert render.native_value == 3.0
+    assert render.prices.student == 2.0
+    assert render.attributes["price"] == 3.0
+    assert render.attributes["date"] == "2025-01-15"
+    with pytest.raises(TypeError):
+        render.attributes["price"] = 1.0
+
+
+@pytest.mark.asyncio
+@patch("homeassistant.helpers.frame.report_usage")
+async def test_coordinator_midnight_rollover(mock_report, mock_config_entry):
+    """Test the days shift at midnight using the retained week only."""
+    from custom_components.ingolstadt_mensa.api import THIMensaApiClient
+
+    now = dt_util.now()
+    today = now.date()
+    food_data = {
+        "foodData": [
+            {
+                "timestamp": (today + timedelta(days=offset)).isoformat(),
+                "meals": [{"id": f"day-{offset}"}],
+            }
+            for offset in range(4)
+        ],
+        "errors": [],
+    }
+    coordinator = THIMensaDataUpdateCoordinator(
+        hass=MagicMock(),
+        logger=MagicMock(),
+        name="test",
+    )
+    coordinator.config_entry = mock_config_entry
+    client = MagicMock(spec=THIMensaApiClient)
+    client.async_fetch_meals = AsyncMock(return_value=food_data)
+    _setup_runtime_data(mock_config_entry, client, "IngolstadtMensa")
+    coordinator.data = await coordinator._async_update_data()
+    listener = MagicMock()
+    coordinator.async_add_listener(listener)
+
+    with patch("homeassistant.util.dt.now", return_value=now + timedelta(days=1)):
+        coordinator._async_midnight_rollover(now + timedelta(days=1))
+
+    assert coordinator.data.day(0).meals[0].id == "day-1"
+    assert coordinator.data.day(1).meals[0].id == "day-2"
+    assert set(coordinator.data.slots) == {(0, 0), (1, 0)}
+    assert coordinator.rollovers == 1
+    listener.assert_called_once()
+    client.async_fetch_meals.assert_awaited_once()
+
+
+def test_menu_horizon():
+    """Test only the configured number of days ahead gets rendered."""
+    today = dt_util.now().date()
+    food_data = [
+        {
+            "timestamp": (today + timedelta(days=offset)).isoformat(),
+            "meals": [{"id": f"day-{offset}"}],
+        }
+        for offset in range(5)
+    ]
+
+    menu = _menu_for(food_data, days_ahead=3)
+
+    assert set(menu.slots) == {(0, 0), (1, 0), (2, 0), (3, 0)}
+    assert menu.day(4).meals[0].id == "day-4"
+    assert menu.days is menu.days
+
+
+@pytest.mark.asyncio
+@patch("homeassistant.helpers.frame.report_usage")
+async def test_coordinator_changed_slots(
+    mock_report, mock_config_entry, sample_meal_data
+):
+    """Test listeners learn which slots changed since the last notification."""
+    from custom_components.ingolstadt_mensa.api import THIMensaApiClient
+
+    today = dt_util.now().date()
+    for day_offset, entry in enumerate(sample_meal_data["foodData"]):
+        entry["timestamp"] = (today + timedelta(days=day_offset)).isoformat()
+    coordinator = THIMensaDataUpdateCoordinator(
+        hass=MagicMock(), logger=MagicMock(), name="test"
+    )
+    coordinator.config_entry = mock_config_entry
+    client = MagicMock(spec=THIMensaApiClient)
+    client.async_fetch_meals = AsyncMock(return_value=sample_meal_data)
+    hub = _setup_runtime_data(mock_config_entry, client, "IngolstadtMensa")
+    seen = []
+    coordinator.async_add_listener(lambda: seen.append(coordinator.changed_slots))
+
+    await hub.async_refresh()
+    coordinator.async_handle_hub_update()
+    sample_meal_data["foodData"][1]["meals"][0]["prices"]["student"] = 4.2
+    await hub.async_refresh()
+    coordinator.async_handle_hub_update()
+    coordinator.async_set_update_error(UpdateFailed("API down"))
+
+    # The first and the failed notification concern every slot
+    assert seen == [None, frozenset({(1, 0)}), None]
+
+
+@pytest.mark.asyncio
+@patch("homeassistant.helpers.frame.report_usage")
+async def test_coordinator_entity_update_during_outage(
+    mock_report, mock_config_entry, sample_meal_data
+):
+    """Test a direct refresh after a failed hub refresh does not pass as fresh."""
+    from custom_components.ingolstadt_mensa.api import (
+        THIMensaApiClient,
+        THIMensaApiCommunicationError,
+    )
+
+    today = dt_util.now().date()
+    sample_meal_data["foodData"][0]["timestamp"] = today.isoformat()
+    coordinator = THIMensaDataUpdateCoordinator(
+        hass=MagicMock(), logger=MagicMock(), name="test"
+    )
+    coordinator.config_entry = mock_config_entry
+    client = MagicMock(spec=THIMensaApiClient)
+    client.async_fetch_meals = AsyncMock(return_value=sample_meal_data)
+    hub = _setup_runtime_data(mock_config_entry, client, "IngolstadtMensa")
+    await coordinator.async_refresh()
+    listener = MagicMock()
+    coordinator.async_add_listener(listener)
+
+    client.async_fetch_meals.side_effect = THIMensaApiCommunicationError("down")
+    await hub.async_refresh()
+    assert client.async_fetch_meals.call_count == 2
+
+    # homeassistant.update_entity goes through the coordinator's own refresh
+    with patch(
+        "custom_components.ingolstadt_mensa.coordinator.async_call_later"
+    ) as mock_call_later:
+        await coordinator.async_refresh()
+
+    assert client.async_fetch_meals.call_count == 3
+    assert coordinator.last_update_success
+    assert coordinator.freshness == "stale"
+    mock_call_later.assert_called_once()
+    # The unchanged data object still publishes the stale freshness
+    listener.assert_called_once()
+
+    client.async_fetch_meals.side_effect = None
+    await coordinator.async_refresh()
+    assert client.async_fetch_meals.call_count == 4
+    assert coordinator.freshness == "fresh"
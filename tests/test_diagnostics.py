@@ -0,0 +1,79 @@
+"""Tests for diagnostics."""
+
+from __future__ import annotations
+
+import json
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.ingolstadt_mensa.api import THIMensaApiClient
+from custom_components.ingolstadt_mensa.coordinator import (
+    THIMensaDataUpdateCoordinator,
+)
+from custom_components.ingolstadt_mensa.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.ingolstadt_mensa.hub import THIMensaHub
+
+pytestmark = pytest.mark.usefixtures("mock_store")
+
+
+@pytest.mark.asyncio
+@patch("homeassistant.helpers.frame.report_usage")
+async def test_config_entry_diagnostics(
+    mock_report, mock_config_entry, sample_meal_data
+):
+    """Test diagnostics report refresh timings, counters and a redacted meal."""
+    today = dt_util.now().date()
+    for day_offset, entry in enumerate(sample_meal_data["foodData"]):
+        entry["timestamp"] = (today + timedelta(days=day_offset)).isoformat()
+    api_client = THIMensaApiClient(session=MagicMock())
+    api_client.async_fetch_meals = AsyncMock(return_value=sample_meal_data)
+    hub = THIMensaHub(MagicMock(), api_client)
+    hub.async_add_location("IngolstadtMensa")
+    coordinator = THIMensaDataUpdateCoordinator(
+        hass=MagicMock(), logger=MagicMock(), name="test"
+    )
+    coordinator.config_entry = mock_config_entry
+    mock_config_entry.runtime_data = MagicMock(
+        coordinator=coordinator,
+        hub=hub,
+        location="IngolstadtMensa",
+        price_group="student",
+        days_ahead=1,
+        excluded_allergens=0,
+        required_flags=0,
+    )
+
+    def _write_state() -> None:
+        coordinator.entity_writes += 1
+
+    coordinator.async_add_listener(_write_state)
+    coordinator.async_add_listener(_write_state)
+    for _ in range(2):
+        await hub.async_refresh()
+        coordinator.async_handle_hub_update()
+
+    diagnostics = await async_get_config_entry_diagnostics(
+        MagicMock(), mock_config_entry
+    )
+
+    refreshes = diagnostics["coordinator"]["refreshes"]
+    assert [record["changed"] for record in refreshes] == [True, False]
+    assert [record["entity_writes"] for record in refreshes] == [2, 0]
+    assert refreshes[0]["network_ms"] is not None
+    assert refreshes[0]["payload_bytes"] > 0
+    assert diagnostics["coordinator"]["updates_skipped"] == 1
+    assert diagnostics["coordinator"]["unchanged_ratio"] == 0.5
+    assert diagnostics["api"]["circuit_breaker"]["state"] == "closed"
+    assert diagnostics["hub"]["locations"] == ["IngolstadtMensa"]
+
+    meal = diagnostics["model_sample"]["meal"]
+    assert meal["category"] == "main"
+    assert meal["name"]["de"] == "**REDACTED**"
+    assert meal["prices"]["student"] == 3.5
+    # The snapshot must be serializable as it is downloaded as JSON
+    json.dumps(diagnostics)
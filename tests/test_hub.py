@@ -0,0 +1,199 @@
+"""Tests for the shared hub."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.ingolstadt_mensa.api import THIMensaApiClient
+from custom_components.ingolstadt_mensa.const import DOMAIN
+from custom_components.ingolstadt_mensa.hub import (
+    THIMensaHub,
+    _partition_errors,
+    _partition_food_data,
+    async_get_hub,
+)
+
+
+pytestmark = pytest.mark.usefixtures("mock_store")
+
+
+@pytest.fixture
+def batched_food():
+    """Batched response covering two locations."""
+    return {
+        "foodData": [
+            {
+                "timestamp": "2025-01-15T00:00:00Z",
+                "meals": [
+                    {"id": "1", "restaurant": "IngolstadtMensa"},
+                    {"id": "2", "restaurant": "NeuburgMensa"},
+                    {"id": "3", "restaurant": "IngolstadtMensa"},
+                ],
+            },
+        ],
+        "errors": [],
+    }
+
+
+def _make_hub(result):
+    client = MagicMock(spec=THIMensaApiClient)
+    client.async_fetch_meals = AsyncMock(return_value=result)
+    return THIMensaHub(MagicMock(), client)
+
+
+def test_partition_food_data(batched_food):
+    """Test meals are split by their restaurant field."""
+    result = _partition_food_data(
+        batched_food["foodData"], ["IngolstadtMensa", "NeuburgMensa"]
+    )
+
+    assert [m["id"] for m in result["IngolstadtMensa"][0]["meals"]] == ["1", "3"]
+    assert [m["id"] for m in result["NeuburgMensa"][0]["meals"]] == ["2"]
+    assert result["NeuburgMensa"][0]["timestamp"] == "2025-01-15T00:00:00Z"
+
+
+def test_partition_food_data_single_location_without_restaurant():
+    """Test meals without restaurant are kept when only one location is asked."""
+    food_data = [{"timestamp": "2025-01-15", "meals": [{"id": "1"}]}]
+
+    single = _partition_food_data(food_data, ["Canisius"])
+    multiple = _partition_food_data(food_data, ["Canisius", "Reimanns"])
+
+    assert single["Canisius"][0]["meals"] == [{"id": "1"}]
+    assert multiple["Canisius"][0]["meals"] == []
+    assert multiple["Reimanns"][0]["meals"] == []
+
+
+def test_partition_errors():
+    """Test errors are attributed to their location or to all locations."""
+    locations = ["IngolstadtMensa", "NeuburgMensa"]
+
+    assert _partition_errors(
+        [{"location": "NeuburgMensa", "message": "closed"}], locations
+    ) == {"NeuburgMensa": "closed"}
+    assert _partition_errors([{"message": "boom"}], locations) == {
+        "IngolstadtMensa": "boom",
+        "NeuburgMensa": "boom",
+    }
+    assert _partition_errors(None, locations) == {}
+
+
+@pytest.mark.asyncio
+async def test_hub_batches_all_locations(batched_food):
+    """Test one request is issued for all registered locations."""
+    hub = _make_hub(batched_food)
+    hub.async_add_location("NeuburgMensa")
+    hub.async_add_location("IngolstadtMensa")
+
+    ingolstadt = await hub.async_get_food_data("IngolstadtMensa")
+    neuburg = await hub.async_get_food_data("NeuburgMensa")
+
+    hub.client.async_fetch_meals.assert_awaited_once_with(
+        ["IngolstadtMensa", "NeuburgMensa"]
+    )
+    assert len(ingolstadt[0]["meals"]) == 2
+    assert len(neuburg[0]["meals"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_hub_location_error(batched_food):
+    """Test a per-location error only fails that location."""
+    batched_food["errors"] = [{"location": "NeuburgMensa", "message": "closed"}]
+    hub = _make_hub(batched_food)
+    hub.async_add_location("IngolstadtMensa")
+    hub.async_add_location("NeuburgMensa")
+
+    assert await hub.async_get_food_data("IngolstadtMensa")
+    with pytest.raises(UpdateFailed, match="closed"):
+        await hub.async_get_food_data("NeuburgMensa")
+
+
+def test_hub_remove_location_refcount():
+    """Test a location stays registered until its last user is removed."""
+    hub = _make_hub({})
+    remove_first = hub.async_add_location("Canisius")
+    remove_second = hub.async_add_location("Canisius")
+
+    remove_first()
+    assert hub.locations == ["Canisius"]
+
+    remove_second()
+    assert hub.locations == []
+
+
+@patch("custom_components.ingolstadt_mensa.hub.async_create_clientsession")
+def test_async_get_hub_is_shared(mock_get_session):
+    """Test the hub is created once per Home Assistant instance."""
+    hass = MagicMock()
+    hass.data = {}
+
+    hub = async_get_hub(hass)
+
+    assert hass.data[DOMAIN] is hub
+    assert async_get_hub(hass) is hub
+    mock_get_session.assert_called_once_with(
+        hass, trace_configs=[hub.client.tracer.trace_config]
+    )
+
+
+@pytest.mark.asyncio
+async def test_hub_persists_successful_fetch(batched_food, mock_store):
+    """Test fetched menus are written to the cache, except failed locations."""
+    batched_food["errors"] = [{"location": "NeuburgMensa", "message": "closed"}]
+    hub = _make_hub(batched_food)
+    hub.async_add_location("IngolstadtMensa")
+    hub.async_add_location("NeuburgMensa")
+
+    await hub.async_refresh()
+
+    mock_store.async_delay_save.assert_called_once()
+    stored = hub._cache_to_store()["locations"]
+    assert set(stored) == {"IngolstadtMensa"}
+    assert stored["IngolstadtMensa"]["food_data"][0]["meals"][0]["id"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_hub_persists_idle_slots(mock_store):
+    """Test idle slot times are stored per entry and dropped with the entry."""
+    mock_store.async_load.return_value = {
+        "locations": {},
+        "idle_slots": {"entry": {"0-4": "2025-01-15T06:00:00+00:00"}},
+    }
+    hub = _make_hub({})
+
+    assert await hub.async_get_idle_slots("entry") == {
+        "0-4": "2025-01-15T06:00:00+00:00"
+    }
+    assert await hub.async_get_idle_slots("other") == {}
+
+    hub.async_set_idle_slots("other", {"1-2": "2025-01-16T06:00:00+00:00"})
+    await hub.async_remove_entry("entry")
+
+    assert hub._cache_to_store()["idle_slots"] == {
+        "other": {"1-2": "2025-01-16T06:00:00+00:00"}
+    }
+    assert mock_store.async_delay_save.call_count == 2
+
+    # Forgetting an entry without idle slots does not save again
+    await hub.async_remove_entry("entry")
+    assert mock_store.async_delay_save.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_hub_cached_food_data(mock_store):
+    """Test persisted menus are served without a request."""
+    food_data = [{"timestamp": "2025-01-15", "meals": [{"id": "1"}]}]
+    mock_store.async_load.return_value = {
+        "locations": {
+            "Canisius": {"fetched_at": "2025-01-15T06:00:00", "food_data": food_data}
+        }
+    }
+    hub = _make_hub({})
+
+    assert await hub.async_get_cached_food_data("Canisius") == food_data
+    assert await hub.async_get_cached_food_data("Reimanns") is None
+    mock_store.async_load.assert_awaited_once()
+    hub.client.async_fetch_meals.assert_not_called()
@@ -0,0 +1,73 @@
+"""Import-time budget of the integration package."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+PACKAGE = "custom_components.ingolstadt_mensa"
+
+# Home Assistant has loaded these before it sets up any integration, so
+# their cost must not be attributed to this package.
+PRELOADED = (
+    "homeassistant.config_entries",
+    "homeassistant.core",
+    "homeassistant.helpers.aiohttp_client",
+    "homeassistant.helpers.event",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.loader",
+)
+
+# Modules Home Assistant only loads for a running flow, a platform or a
+# diagnostics download, which setting up the package must not pull in.
+DEFERRED = (
+    f"{PACKAGE}.calendar",
+    f"{PACKAGE}.config_flow",
+    f"{PACKAGE}.diagnostics",
+    f"{PACKAGE}.sensor",
+    "homeassistant.components.diagnostics",
+    "homeassistant.helpers.selector",
+)
+
+# Measured at about 20 ms, the budget leaves room for slow CI machines
+BUDGET_US = 150_000
+
+MARKER = "-- package import --"
+
+
+def _import_times() -> dict[str, tuple[int, int]]:
+    """Return the self and cumulative import time of each new module."""
+    script = "\n".join(
+        [
+            *(f"import {module}" for module in PRELOADED),
+            f"import sys; print({MARKER!r}, file=sys.stderr, flush=True)",
+            f"import {PACKAGE}",
+        ]
+    )
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        check=True,
+        cwd=Path(__file__).parent.parent,
+        text=True,
+    )
+    lines = result.stderr.split(MARKER, 1)[1].splitlines()
+    times = {}
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        times[module.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def test_package_import_time():
+    """Test the package stays within budget and leaves deferred modules alone."""
+    times = _import_times()
+
+    assert PACKAGE in times
+    assert not set(DEFERRED) & times.keys()
+    _, cumulative_us = times[PACKAGE]
+    assert cumulative_us < BUDGET_US, times
@@ -0,0 +1,139 @@
+"""Tests for the typed meal model."""
+
+from __future__ import annotations
+
+import dataclasses
+
+import pytest
+
+from custom_components.ingolstadt_mensa.models import (
+    ALLERGENS,
+    FLAGS,
+    CodeRegistry,
+    DayMenu,
+    LocalizedName,
+    Meal,
+    Prices,
+    SlotRender,
+    category_icon,
+    strip_restaurant_prefix,
+)
+
+
+def test_strip_restaurant_prefix():
+    """Test restaurant prefix stripping."""
+    assert strip_restaurant_prefix("THI Mensa: Spaghetti") == "Spaghetti"
+    assert strip_restaurant_prefix("Ingolstadt Mensa - Pizza") == "Pizza"
+    assert strip_restaurant_prefix("Regular Meal Name") == "Regular Meal Name"
+    assert strip_restaurant_prefix(None) is None
+
+
+def test_strip_restaurant_prefix_case_insensitive():
+    """Test restaurant prefix stripping is case insensitive."""
+    assert strip_restaurant_prefix("thi mensa: Spaghetti") == "Spaghetti"
+    assert strip_restaurant_prefix("INGOLSTADT MENSA - Pizza") == "Pizza"
+
+
+def test_category_icon():
+    """Test icons per category, including the default."""
+    assert category_icon("Main") == "mdi:silverware-fork-knife"
+    assert category_icon("dessert") == category_icon("desert") == "mdi:cake"
+    assert category_icon("unknown") == "mdi:food"
+    assert category_icon(None) == "mdi:food"
+
+
+def test_meal_from_api(sample_meal_data):
+    """Test a raw meal is decoded into typed fields."""
+    raw = sample_meal_data["foodData"][0]["meals"][0]
+    meal = Meal.from_api(raw)
+
+    assert meal.id == "1"
+    assert meal.meal_id == "meal-1"
+    assert meal.category == "main"
+    assert meal.restaurant == "IngolstadtMensa"
+    assert meal.name.de == "Spaghetti Bolognese"
+    assert meal.prices.student == 3.5
+    assert meal.allergens == ("gluten", "milk")
+    assert meal.flags == ("vegetarian",)
+    assert meal.icon == "mdi:silverware-fork-knife"
+
+
+def test_meal_from_api_missing_fields():
+    """Test missing optional fields decode to empty values."""
+    meal = Meal.from_api({"id": "x"})
+
+    assert meal.name.resolve("en") is None
+    assert meal.prices.get("student") is None
+    assert meal.allergens == ()
+    assert meal.flags == ()
+    assert meal.icon == "mdi:food"
+
+
+def test_localized_name_resolve():
+    """Test names are stripped once and resolved with language fallback."""
+    name = LocalizedName.from_api({"de": "THI Mensa: Suppe", "en": None})
+
+    assert name.de == "THI Mensa: Suppe"
+    assert name.display_de == "Suppe"
+    assert name.resolve("de") == "Suppe"
+    assert name.resolve("en") == "Suppe"
+
+
+def test_prices_rounding_and_lookup():
+    """Test prices are rounded and looked up by price group."""
+    prices = Prices.from_api({"student": "3.555", "guest": 5})
+
+    assert prices.student == 3.56
+    assert prices.get("guest") == 5.0
+    assert prices.get("employee") is None
+    assert prices.get("unknown") is None
+
+
+def test_models_are_frozen_and_slotted():
+    """Test model instances are immutable and carry no instance dict."""
+    day = DayMenu.from_api("2025-01-15", [{"id": "1"}])
+
+    assert not hasattr(day.meals[0], "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        day.meals[0].id = "2"
+
+
+def test_slot_render_uses_name_cache():
+    """Test names are resolved once per meal id and language."""
+    meal = Meal.from_api({"id": "1", "name": {"de": "Suppe", "en": "Soup"}})
+    names = {}
+
+    SlotRender.from_meal(meal, "2025-01-15", "de", "student", names)
+    assert names == {("1", "de"): "Suppe"}
+
+    names[("1", "de")] = "Cached"
+    render = SlotRender.from_meal(meal, "2025-01-15", "de", "student", names)
+    assert render.name == "Cached"
+    english = SlotRender.from_meal(meal, "2025-01-15", "en", "student", names)
+    assert english.name == "Soup"
+
+
+def test_code_registry():
+    """Test codes are encoded as masks and decoded sorted."""
+    registry = CodeRegistry()
+    mask = registry.encode(["milk", "gluten"])
+    assert registry.encode(["gluten"]) == registry.bit("gluten") == 0b10
+    assert registry.bit("eggs") == 0
+    assert registry.decode(mask) == ("gluten", "milk")
+    assert registry.decode(registry.encode(["eggs", "milk"])) == ("eggs", "milk")
+    assert registry.decode(0) == ()
+    assert len(registry) == 3
+
+
+def test_meal_masks():
+    """Test meals carry masks and decode their codes on demand."""
+    vegan = Meal.from_api({"flags": ["vegan", "vegetarian"], "allergens": ["soy"]})
+    gluten = Meal.from_api({"flags": ["vegetarian"], "allergens": ["gluten"]})
+    vegan_bit = FLAGS.bit("vegan")
+    gluten_bit = ALLERGENS.bit("gluten")
+
+    assert vegan.flags == ("vegan", "vegetarian")
+    assert vegan.flag_mask & vegan_bit
+    assert not gluten.flag_mask & vegan_bit
+    assert gluten.allergen_mask & gluten_bit
+    assert not vegan.allergen_mask & gluten_bit
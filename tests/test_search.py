@@ -0,0 +1,169 @@
+"""Tests for the meal search index and service."""
+
+from __future__ import annotations
+
+from datetime import date
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.ingolstadt_mensa.models import DayMenu, MensaMenu
+from custom_components.ingolstadt_mensa.search import MealIndex, tokenize
+from custom_components.ingolstadt_mensa.services import (
+    SEARCH_MEALS_SCHEMA,
+    async_search_meals,
+)
+
+TODAY = date(2025, 1, 15).toordinal()
+
+
+def _meal(meal_id, de, en, *, student=3.5, **fields):
+    return {
+        "id": meal_id,
+        "name": {"de": de, "en": en},
+        "category": "main",
+        "prices": {"student": student, "guest": student + 2},
+        **fields,
+    }
+
+
+def _days(*meals_per_day):
+    return {
+        TODAY + offset: DayMenu.from_api(
+            date.fromordinal(TODAY + offset).isoformat(), meals
+        )
+        for offset, meals in enumerate(meals_per_day)
+    }
+
+
+@pytest.fixture
+def days():
+    """Two days of meals."""
+    return _days(
+        [
+            _meal(
+                "1",
+                "Schnitzel mit Pommes",
+                "Schnitzel with fries",
+                allergens=["gluten"],
+            ),
+            _meal("2", "Gemüsecurry", "Vegetable curry", flags=["vegan"], student=2.9),
+            _meal(
+                "3",
+                "Obstsalat",
+                "Fruit salad",
+                category="dessert",
+                flags=["vegan"],
+                student=1.2,
+            ),
+        ],
+        [
+            _meal(
+                "4",
+                "Vegane Schnitzel",
+                "Vegan schnitzel",
+                flags=["vegan"],
+                allergens=["gluten"],
+            ),
+        ],
+    )
+
+
+def _ids(matches):
+    return [meal.id for _, meal in matches]
+
+
+def test_tokenize():
+    """Test tokens are case-folded words, so "ß" matches "ss"."""
+    assert tokenize("Schnitzel mit Pommes, Soße!") == {
+        "schnitzel",
+        "mit",
+        "pommes",
+        "sosse",
+    }
+    assert tokenize(None) == set()
+
+
+def test_search(days):
+    """Test every criterion narrows the result, ordered by date."""
+    index = MealIndex()
+    index.update(days)
+
+    assert len(index) == 4
+    assert _ids(index.search(query="schnitzel")) == ["1", "4"]
+    assert _ids(index.search(query="Vegetable CURRY")) == ["2"]
+    assert _ids(index.search(query="schnitzel curry")) == []
+    assert _ids(index.search(category="Dessert")) == ["3"]
+    assert _ids(index.search(flags=["vegan"], exclude_allergens=["gluten"])) == [
+        "2",
+        "3",
+    ]
+    assert _ids(index.search(price_group="student", max_price=3)) == ["2", "3"]
+    assert _ids(index.search(price_group="guest", min_price=5)) == ["1", "4"]
+    assert _ids(index.search(price_group="employee", min_price=0)) == []
+    assert _ids(index.search()) == ["1", "2", "3", "4"]
+
+
+def test_update_reindexes_changed_days_only(days):
+    """Test a refresh drops past days and re-indexes changed ones."""
+    index = MealIndex()
+    index.update(days)
+    tomorrow = index._day_docs[TODAY + 1]
+
+    changed = {
+        TODAY + 1: days[TODAY + 1],
+        TODAY + 2: DayMenu.from_api(
+            date.fromordinal(TODAY + 2).isoformat(),
+            [
+                _meal(
+                    "5", "Linsensuppe", "Lentil soup", category="soup", flags=["vegan"]
+                )
+            ],
+        ),
+    }
+    index.update(changed)
+
+    assert index._day_docs[TODAY + 1] is tomorrow
+    assert _ids(index.search(flags=["vegan"])) == ["4", "5"]
+    assert index.search(query="curry") == []
+    # Postings of dropped meals are removed, not left empty
+    assert "curry" not in index._tokens
+    assert "dessert" not in index._categories
+
+
+async def test_search_meals_service(days, mock_config_entry):
+    """Test the service answers from the index of every loaded entry."""
+    coordinator = MagicMock()
+    coordinator.data = MensaMenu.build(days, TODAY, 1, "en", "student")
+    coordinator.index = MealIndex()
+    coordinator.index.update(days)
+    mock_config_entry.runtime_data = MagicMock(
+        coordinator=coordinator, location="IngolstadtMensa", price_group="guest"
+    )
+    call = MagicMock()
+    call.hass.config_entries.async_loaded_entries.return_value = [mock_config_entry]
+    call.data = SEARCH_MEALS_SCHEMA(
+        {"query": "schnitzel", "flags": "vegan", "max_price": 5.6}
+    )
+
+    response = await async_search_meals(call)
+
+    assert response == {
+        "meals": [
+            {
+                "location": "IngolstadtMensa",
+                "date": "2025-01-16",
+                "name": "Vegan schnitzel",
+                "name_de": "Vegane Schnitzel",
+                "name_en": "Vegan schnitzel",
+                "category": "main",
+                "restaurant": None,
+                "price": 5.5,
+                "price_student": 3.5,
+                "price_employee": None,
+                "price_guest": 5.5,
+                "allergens": ["gluten"],
+                "flags": ["vegan"],
+            }
+        ]
+    }
@@ -1,19 +1,45 @@
 """Tests for sensor entities."""
 
 from __future__ import annotations
+
+from datetime import date, timedelta
 from types import SimpleNamespace
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
-
-from custom_components.ingolstadt_mensa.sensor import MensaMealSensor
+from homeassistant.util import dt as dt_util
+
+from custom_components.ingolstadt_mensa.const import day_offset
+from custom_components.ingolstadt_mensa.coordinator import _get_preferred_language
+from custom_components.ingolstadt_mensa.models import DayMenu, MensaMenu
+from custom_components.ingolstadt_mensa.sensor import (
+    MealSlotPool,
+    MensaMealSensor,
+    _parse_slot_unique_id,
+)
+
+
+def _load_menu(coordinator, raw_menu, entry=None):
+    """Decode and render a raw menu into the coordinator data, as a refresh would."""
+    price_group = "student"
+    if entry is not None:
+        price_group = entry.options.get("price_group", entry.data["price_group"])
+    today = date.fromisoformat(raw_menu["today"]["timestamp"]).toordinal()
+    days = {
+        today + day_offset(day): DayMenu.from_api(
+            day_data["timestamp"], day_data["meals"]
+        )
+        for day, day_data in raw_menu.items()
+    }
+    coordinator.data = MensaMenu.build(
+        days, today, 1, _get_preferred_language(coordinator.hass), price_group
+    )
 
 
 @pytest.fixture
-def mock_coordinator():
-    """Create a mock coordinator."""
-    coordinator = MagicMock()
-    coordinator.data = {
+def raw_menu():
+    """Raw meals per day as returned by the API."""
+    return {
         "today": {
             "timestamp": "2025-01-15",
             "meals": [
@@ -67,8 +93,17 @@ def mock_coordinator():
             ],
         },
     }
+
+
+@pytest.fixture
+def mock_coordinator(raw_menu):
+    """Create a mock coordinator."""
+    coordinator = MagicMock()
     coordinator.hass = SimpleNamespace()
     coordinator.hass.config = SimpleNamespace(language="en")
+    coordinator.last_update_success = True
+    coordinator.freshness = "fresh"
+    _load_menu(coordinator, raw_menu)
     return coordinator
 
 
@@ -82,34 +117,37 @@ def mock_entry():
     return entry
 
 
-def test_sensor_name_german(mock_coordinator, mock_entry):
+def test_sensor_name_german(mock_coordinator, mock_entry, raw_menu):
     """Test sensor friendly name uses German meal title."""
     mock_coordinator.hass.config.language = "de"
-    mock_coordinator.data["today"]["meals"][0]["name"] = {
+    raw_menu["today"]["meals"][0]["name"] = {
         "de": "Deutscher Titel",
         "en": "English Title",
     }
+    _load_menu(mock_coordinator, raw_menu)
     sensor = MensaMealSensor(mock_coordinator, mock_entry, 0, "today")
 
     assert sensor.name == "Deutscher Titel"
 
 
-def test_sensor_name_english(mock_coordinator, mock_entry):
+def test_sensor_name_english(mock_coordinator, mock_entry, raw_menu):
     """Test sensor friendly name uses English meal title."""
     mock_coordinator.hass.config.language = "en"
-    mock_coordinator.data["today"]["meals"][0]["name"] = {
+    raw_menu["today"]["meals"][0]["name"] = {
         "de": "Deutscher Titel",
         "en": "English Title",
     }
+    _load_menu(mock_coordinator, raw_menu)
     sensor = MensaMealSensor(mock_coordinator, mock_entry, 0, "today")
 
     assert sensor.name == "English Title"
 
 
-def test_sensor_name_language_fallback(mock_coordinator, mock_entry):
+def test_sensor_name_language_fallback(mock_coordinator, mock_entry, raw_menu):
     """Test sensor friendly name falls back to available language."""
     mock_coordinator.hass.config.language = "de"
-    mock_coordinator.data["today"]["meals"][0]["name"] = {"en": "English Only Meal"}
+    raw_menu["today"]["meals"][0]["name"] = {"en": "English Only Meal"}
+    _load_menu(mock_coordinator, raw_menu)
     sensor = MensaMealSensor(mock_coordinator, mock_entry, 0, "today")
 
     assert sensor.name == "English Only Meal"
@@ -156,20 +194,25 @@ def test_sensor_native_value(mock_coordinator, mock_entry):
     assert sensor.native_value == 3.5
 
 
-def test_sensor_native_value_different_price_groups(mock_coordinator, mock_entry):
+def test_sensor_native_value_different_price_groups(
+    mock_coordinator, mock_entry, raw_menu
+):
     """Test sensor native value with different price groups."""
     mock_entry.data["price_group"] = "employee"
+    _load_menu(mock_coordinator, raw_menu, mock_entry)
     sensor = MensaMealSensor(mock_coordinator, mock_entry, 0, "today")
     assert sensor.native_value == 4.5
 
     mock_entry.data["price_group"] = "guest"
+    _load_menu(mock_coordinator, raw_menu, mock_entry)
     sensor = MensaMealSensor(mock_coordinator, mock_entry, 0, "today")
     assert sensor.native_value == 5.5
 
 
-def test_sensor_native_value_from_options(mock_coordinator, mock_entry):
+def test_sensor_native_value_from_options(mock_coordinator, mock_entry, raw_menu):
     """Test sensor native value uses options over data."""
     mock_entry.options = {"price_group": "employee"}
+    _load_menu(mock_coordinator, raw_menu, mock_entry)
     sensor = MensaMealSensor(mock_coordinator, mock_entry, 0, "today")
     assert sensor.native_value == 4.5
 
@@ -180,18 +223,20 @@ def test_sensor_native_value_none(mock_coordinator, mock_entry):
     assert sensor.native_value is None
 
 
-def test_sensor_native_value_missing_price(mock_coordinator, mock_entry):
+def test_sensor_native_value_missing_price(mock_coordinator, mock_entry, raw_menu):
     """Test sensor native value when price is missing."""
     mock_entry.data["price_group"] = "guest"
+    _load_menu(mock_coordinator, raw_menu, mock_entry)
     sensor = MensaMealSensor(
         mock_coordinator, mock_entry, 2, "today"
     )  # Meal 3 has no guest price
     assert sensor.native_value is None
 
 
-def test_sensor_native_value_rounding(mock_coordinator, mock_entry):
+def test_sensor_native_value_rounding(mock_coordinator, mock_entry, raw_menu):
     """Test sensor native value rounding to 2 decimal places."""
-    mock_coordinator.data["today"]["meals"][0]["prices"]["student"] = 3.555
+    raw_menu["today"]["meals"][0]["prices"]["student"] = 3.555
+    _load_menu(mock_coordinator, raw_menu)
     sensor = MensaMealSensor(mock_coordinator, mock_entry, 0, "today")
     assert sensor.native_value == 3.56
 
@@ -223,23 +268,26 @@ def test_sensor_icon(mock_coordinator, mock_entry):
     assert sensor_soup.icon == "mdi:bowl"
 
 
-def test_sensor_icon_unknown_category(mock_coordinator, mock_entry):
+def test_sensor_icon_unknown_category(mock_coordinator, mock_entry, raw_menu):
     """Test sensor icon with unknown category."""
-    mock_coordinator.data["today"]["meals"][0]["category"] = "unknown"
+    raw_menu["today"]["meals"][0]["category"] = "unknown"
+    _load_menu(mock_coordinator, raw_menu)
     sensor = MensaMealSensor(mock_coordinator, mock_entry, 0, "today")
     assert sensor.icon == "mdi:food"
 
 
-def test_sensor_icon_no_category(mock_coordinator, mock_entry):
+def test_sensor_icon_no_category(mock_coordinator, mock_entry, raw_menu):
     """Test sensor icon when category is None."""
-    mock_coordinator.data["today"]["meals"][0]["category"] = None
+    raw_menu["today"]["meals"][0]["category"] = None
+    _load_menu(mock_coordinator, raw_menu)
     sensor = MensaMealSensor(mock_coordinator, mock_entry, 0, "today")
     assert sensor.icon == "mdi:food"
 
 
-def test_sensor_icon_desert_spelling(mock_coordinator, mock_entry):
+def test_sensor_icon_desert_spelling(mock_coordinator, mock_entry, raw_menu):
     """Test sensor icon handles 'desert' spelling variant."""
-    mock_coordinator.data["today"]["meals"][0]["category"] = "desert"
+    raw_menu["today"]["meals"][0]["category"] = "desert"
+    _load_menu(mock_coordinator, raw_menu)
     sensor = MensaMealSensor(mock_coordinator, mock_entry, 0, "today")
     assert sensor.icon == "mdi:cake"
 
@@ -290,57 +338,34 @@ def test_sensor_extra_state_attributes_tomorrow(mock_coordinator, mock_entry):
 def test_sensor_preferred_language_de(mock_coordinator, mock_entry):
     """Test preferred language detection for German."""
     mock_coordinator.hass.config.language = "de"
-    sensor = MensaMealSensor(mock_coordinator, mock_entry, 0, "today")
-
-    assert sensor._get_preferred_language() == "de"
+    assert _get_preferred_language(mock_coordinator.hass) == "de"
 
 
 def test_sensor_preferred_language_en(mock_coordinator, mock_entry):
     """Test preferred language detection for English."""
     mock_coordinator.hass.config.language = "en"
-    sensor = MensaMealSensor(mock_coordinator, mock_entry, 0, "today")
-
-    assert sensor._get_preferred_language() == "en"
+    assert _get_preferred_language(mock_coordinator.hass) == "en"
 
 
 def test_sensor_preferred_language_de_variants(mock_coordinator, mock_entry):
     """Test preferred language detection for German variants."""
     for lang in ["de", "de_DE", "de_AT", "de_CH"]:
         mock_coordinator.hass.config.language = lang
-        sensor = MensaMealSensor(mock_coordinator, mock_entry, 0, "today")
-        assert sensor._get_preferred_language() == "de", f"Failed for {lang}"
+        assert _get_preferred_language(mock_coordinator.hass) == "de", (
+            f"Failed for {lang}"
+        )
 
 
 def test_sensor_preferred_language_none(mock_coordinator, mock_entry):
     """Test preferred language detection when language is None."""
     mock_coordinator.hass.config.language = None
-    sensor = MensaMealSensor(mock_coordinator, mock_entry, 0, "today")
-    assert sensor._get_preferred_language() == "en"
+    assert _get_preferred_language(mock_coordinator.hass) == "en"
 
 
 def test_sensor_preferred_language_exception(mock_coordinator, mock_entry):
     """Test preferred language detection handles exceptions."""
     del mock_coordinator.hass.config.language
-    sensor = MensaMealSensor(mock_coordinator, mock_entry, 0, "today")
-    assert sensor._get_preferred_language() == "en"
-
-
-def test_strip_restaurant_prefix(mock_coordinator, mock_entry):
-    """Test restaurant prefix stripping."""
-    sensor = MensaMealSensor(mock_coordinator, mock_entry, 0, "today")
-
-    assert sensor._strip_restaurant_prefix("THI Mensa: Spaghetti") == "Spaghetti"
-    assert sensor._strip_restaurant_prefix("Ingolstadt Mensa - Pizza") == "Pizza"
-    assert sensor._strip_restaurant_prefix("Regular Meal Name") == "Regular Meal Name"
-    assert sensor._strip_restaurant_prefix(None) is None
-
-
-def test_strip_restaurant_prefix_case_insensitive(mock_coordinator, mock_entry):
-    """Test restaurant prefix stripping is case insensitive."""
-    sensor = MensaMealSensor(mock_coordinator, mock_entry, 0, "today")
-
-    assert sensor._strip_restaurant_prefix("thi mensa: Spaghetti") == "Spaghetti"
-    assert sensor._strip_restaurant_prefix("INGOLSTADT MENSA - Pizza") == "Pizza"
+    assert _get_preferred_language(mock_coordinator.hass) == "en"
 
 
 def test_sensor_unique_id(mock_coordinator, mock_entry):
@@ -361,13 +386,14 @@ def test_sensor_suggested_object_id(mock_coordinator, mock_entry):
     assert sensor_tomorrow._attr_suggested_object_id == "ingolstadt_mensa_tomorrow_2"
 
 
-def test_sensor_entity_id_static(mock_coordinator, mock_entry):
+def test_sensor_entity_id_static(mock_coordinator, mock_entry, raw_menu):
     """Entity ID must stay static regardless of meal name."""
     # Set an unusual meal name to ensure it doesn't influence entity_id
-    mock_coordinator.data["today"]["meals"][0]["name"] = {
+    raw_menu["today"]["meals"][0]["name"] = {
         "de": "Hütten Cordon Bleu vom Schwein mit Zitrone",
         "en": "Hutten Cordon Bleu from pork with lemon",
     }
+    _load_menu(mock_coordinator, raw_menu)
     sensor = MensaMealSensor(mock_coordinator, mock_entry, 0, "today")
     assert sensor.entity_id == "sensor.ingolstadt_mensa_today_1"
 
@@ -393,3 +419,241 @@ def test_sensor_device_info_tomorrow(mock_coordinator, mock_entry):
         ("ingolstadt_mensa", "IngolstadtMensa-tomorrow")
     }
     assert "Ingolstadt Mensa - Tomorrow" in device_info["name"]
+
+
+def test_sensor_reuses_attributes_until_render_changes(
+    mock_coordinator, mock_entry, raw_menu
+):
+    """Test the attributes are only rebuilt for a new render or freshness."""
+    sensor = MensaMealSensor(mock_coordinator, mock_entry, 1, "today")
+    render = mock_coordinator.data.slots[(0, 1)]
+    attributes = sensor.extra_state_attributes
+
+    assert attributes.items() >= render.attributes.items()
+    assert sensor.extra_state_attributes is attributes
+
+    mock_coordinator.freshness = "stale"
+    assert sensor.extra_state_attributes is not attributes
+    assert sensor.extra_state_attributes["freshness"] == "stale"
+
+    attributes = sensor.extra_state_attributes
+    _load_menu(mock_coordinator, raw_menu)
+    assert sensor.extra_state_attributes is not attributes
+
+
+def test_sensor_freshness_attributes(mock_coordinator, mock_entry):
+    """Test every meal sensor reports the freshness of the served menu."""
+    sensor = MensaMealSensor(mock_coordinator, mock_entry, 0, "today")
+
+    assert sensor.extra_state_attributes["freshness"] == "fresh"
+    # The fetch time changes on unchanged refreshes, which write no state
+    assert "last_successful_update" not in sensor.extra_state_attributes
+
+
+def test_sensor_unavailable_after_failed_update(mock_coordinator, mock_entry):
+    """Test the sensor is unavailable once the coordinator gives up the menu."""
+    sensor = MensaMealSensor(mock_coordinator, mock_entry, 0, "today")
+    mock_coordinator.last_update_success = False
+
+    assert sensor.available is False
+
+
+def test_sensor_further_day(mock_coordinator, mock_entry):
+    """Test sensors for days beyond tomorrow get their own device and ids."""
+    sensor = MensaMealSensor(mock_coordinator, mock_entry, 0, "day_3")
+
+    assert sensor.entity_id == "sensor.ingolstadt_mensa_day_3_1"
+    assert sensor._attr_unique_id == "test-entry-day_3-meal-1"
+    assert sensor._attr_device_info["name"] == "Ingolstadt Mensa - In 3 days"
+    assert sensor.name == "Ingolstadt Mensa In 3 days #1"
+    assert sensor.available is False
+
+
+def _make_pool(mock_coordinator, mock_entry, registry_entries=(), idle_slots=None):
+    """Create a slot pool with a mocked entity registry."""
+    mock_entry.runtime_data = SimpleNamespace(
+        coordinator=mock_coordinator,
+        hub=MagicMock(),
+        days_ahead=1,
+        slot_retention=timedelta(days=7),
+    )
+    registry = MagicMock()
+    registry.async_get.return_value = None
+    add_entities = MagicMock()
+    with (
+        patch(
+            "custom_components.ingolstadt_mensa.sensor.er.async_get",
+            return_value=registry,
+        ),
+        patch(
+            "custom_components.ingolstadt_mensa.sensor.er.async_entries_for_config_entry",
+            return_value=list(registry_entries),
+        ),
+    ):
+        pool = MealSlotPool(MagicMock(), mock_entry, add_entities)
+        pool.async_restore(idle_slots or {})
+    return pool, add_entities, registry
+
+
+def test_parse_slot_unique_id():
+    """Test unique IDs are mapped back to their slot."""
+    assert _parse_slot_unique_id("e", "e-today-meal-3") == (0, 2)
+    assert _parse_slot_unique_id("e", "e-day_4-meal-1") == (4, 0)
+    assert _parse_slot_unique_id("e", "e-something") is None
+    assert _parse_slot_unique_id("e", "e-today-meal-x") is None
+
+
+def test_slot_pool_sized_to_menu(mock_coordinator, mock_entry):
+    """Test the pool creates exactly one sensor per served meal."""
+    pool, add_entities, _ = _make_pool(mock_coordinator, mock_entry)
+
+    pool.async_sync()
+
+    assert pool.sizes == {0: 4, 1: 1}
+    added = add_entities.call_args.args[0]
+    assert [sensor.entity_id for sensor in added][-1] == (
+        "sensor.ingolstadt_mensa_tomorrow_1"
+    )
+
+    # Unchanged menus add nothing
+    add_entities.reset_mock()
+    pool.async_sync()
+    add_entities.assert_not_called()
+
+
+def test_slot_pool_grows_beyond_five(mock_coordinator, mock_entry, raw_menu):
+    """Test busy days get more sensors than the old fixed limit."""
+    pool, add_entities, _ = _make_pool(mock_coordinator, mock_entry)
+    pool.async_sync()
+    add_entities.reset_mock()
+
+    raw_menu["today"]["meals"] *= 2
+    _load_menu(mock_coordinator, raw_menu)
+    pool.async_sync()
+
+    assert pool.sizes[0] == 8
+    assert len(add_entities.call_args.args[0]) == 4
+
+
+def test_slot_pool_retires_idle_slots(mock_coordinator, mock_entry, raw_menu):
+    """Test unused trailing slots are removed after the retention."""
+    pool, _, _ = _make_pool(mock_coordinator, mock_entry)
+    pool.async_sync()
+    raw_menu["today"]["meals"] = raw_menu["today"]["meals"][:2]
+    _load_menu(mock_coordinator, raw_menu)
+    now = date(2025, 1, 15)
+    start = dt_util.as_utc(dt_util.start_of_local_day(now))
+
+    with patch(
+        "custom_components.ingolstadt_mensa.sensor.dt_util.utcnow",
+        return_value=start,
+    ):
+        pool.async_sync()
+    assert pool.sizes[0] == 4
+
+    with (
+        patch(
+            "custom_components.ingolstadt_mensa.sensor.dt_util.utcnow",
+            return_value=start + timedelta(days=7),
+        ),
+        patch(
+            "custom_components.ingolstadt_mensa.sensor.er.async_get"
+        ) as mock_registry,
+    ):
+        mock_registry.return_value.async_get.return_value = MagicMock()
+        pool.async_sync()
+
+    assert pool.sizes[0] == 2
+    removed = [
+        call.args[0] for call in mock_registry.return_value.async_remove.call_args_list
+    ]
+    assert removed == [
+        "sensor.ingolstadt_mensa_today_4",
+        "sensor.ingolstadt_mensa_today_3",
+    ]
+
+
+def test_slot_pool_restores_registered_slots(mock_coordinator, mock_entry):
+    """Test the pool is restored from the registry and pruned to the horizon."""
+    entries = [
+        SimpleNamespace(
+            domain="sensor",
+            unique_id=f"test-entry-{day}-meal-{number}",
+            entity_id=f"sensor.ingolstadt_mensa_{day}_{number}",
+        )
+        for day, number in (("today", 6), ("tomorrow", 2), ("day_3", 1))
+    ]
+
+    pool, add_entities, registry = _make_pool(mock_coordinator, mock_entry, entries)
+
+    assert pool.sizes == {0: 6, 1: 2}
+    assert len(add_entities.call_args.args[0]) == 8
+    registry.async_remove.assert_called_once_with("sensor.ingolstadt_mensa_day_3_1")
+
+
+def test_slot_pool_idle_times_survive_restart(mock_coordinator, mock_entry, raw_menu):
+    """Test restored slots keep their persisted idle time instead of restarting it."""
+    entries = [
+        SimpleNamespace(
+            domain="sensor",
+            unique_id=f"test-entry-today-meal-{number}",
+            entity_id=f"sensor.ingolstadt_mensa_today_{number}",
+        )
+        for number in range(1, 6)
+    ]
+    now = dt_util.as_utc(dt_util.start_of_local_day(date(2025, 1, 15)))
+    pool, _, registry = _make_pool(
+        mock_coordinator,
+        mock_entry,
+        entries,
+        {
+            "0-4": (now - timedelta(days=8)).isoformat(),
+            # Slots missing from the registry are not restored
+            "0-7": (now - timedelta(days=8)).isoformat(),
+        },
+    )
+    raw_menu["today"]["meals"] = raw_menu["today"]["meals"][:2]
+    _load_menu(mock_coordinator, raw_menu)
+    registry.async_get.return_value = MagicMock()
+
+    with (
+        patch(
+            "custom_components.ingolstadt_mensa.sensor.dt_util.utcnow",
+            return_value=now,
+        ),
+        patch(
+            "custom_components.ingolstadt_mensa.sensor.er.async_get",
+            return_value=registry,
+        ),
+    ):
+        pool.async_sync()
+
+    assert pool.sizes[0] == 4
+    registry.async_remove.assert_called_once_with("sensor.ingolstadt_mensa_today_5")
+    hub = mock_entry.runtime_data.hub
+    hub.async_set_idle_slots.assert_called_once_with(
+        "test-entry",
+        {"0-2": now.isoformat(), "0-3": now.isoformat()},
+    )
+
+
+def test_sensor_writes_only_changed_slots(mock_coordinator, mock_entry):
+    """Test a coordinator update only writes the state of changed slots."""
+    mock_coordinator.entity_writes = 0
+    changed = MensaMealSensor(mock_coordinator, mock_entry, 0, "tomorrow")
+    unchanged = MensaMealSensor(mock_coordinator, mock_entry, 1, "today")
+
+    for sensor in (changed, unchanged):
+        sensor.async_write_ha_state = MagicMock()
+    mock_coordinator.changed_slots = frozenset({(1, 0)})
+    changed._handle_coordinator_update()
+    unchanged._handle_coordinator_update()
+
+    changed.async_write_ha_state.assert_called_once()
+    unchanged.async_write_ha_state.assert_not_called()
+    assert mock_coordinator.entity_writes == 1
+
+    # Without a change set every slot is written
+    mock_coordinator.changed_slots = None
+    unchanged._handle_coordinator_update()
+    unchanged.async_write_ha_state.assert_called_once()
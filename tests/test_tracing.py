@@ -0,0 +1,64 @@
+"""Tests for the request tracing."""
+
+from __future__ import annotations
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from custom_components.ingolstadt_mensa.api import THIMensaApiClient
+from custom_components.ingolstadt_mensa.tracing import RequestTracer, RollingHistogram
+
+
+def test_rolling_histogram_keeps_recent_samples():
+    """Test the histogram drops the oldest samples and reports percentiles."""
+    histogram = RollingHistogram(size=4)
+    for value in (100, 1, 2, 3, 4):
+        histogram.add(value)
+
+    assert len(histogram) == 4
+    assert histogram.last == 4
+    assert histogram.percentile(50) == 2
+    assert histogram.summary() == {
+        "count": 4,
+        "last": 4,
+        "mean": 2.5,
+        "p50": 2,
+        "p95": 4,
+        "max": 4,
+    }
+    assert RollingHistogram().summary() == {"count": 0}
+
+
+@pytest.mark.asyncio
+async def test_tracer_records_request_phases(sample_api_response):
+    """Test a real request fills every phase histogram."""
+
+    async def _graphql(_request: web.Request) -> web.Response:
+        return web.json_response(sample_api_response)
+
+    app = web.Application()
+    app.router.add_post("/graphql", _graphql)
+    tracer = RequestTracer()
+
+    async with (
+        TestServer(app) as server,
+        aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(resolver=aiohttp.ThreadedResolver()),
+            trace_configs=[tracer.trace_config],
+        ) as session,
+    ):
+        client = THIMensaApiClient(
+            session=session,
+            tracer=tracer,
+            # Use a host name, so the request has to be resolved
+            url=f"http://localhost:{server.port}/graphql",
+        )
+        await client.async_fetch_meals(["IngolstadtMensa"])
+
+    snapshot = tracer.snapshot()
+    for phase in ("dns", "connect", "ttfb", "download", "decode", "total"):
+        assert snapshot[phase]["count"] == 1, phase
+    assert snapshot["bytes_sent"]["last"] > 0
+    assert snapshot["bytes_received"]["last"] > 0